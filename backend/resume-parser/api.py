@@ -1,15 +1,20 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import shutil
 import os
+import json
+import time
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, List
 
 # Import our existing logic
 # Import our existing logic
-from resumeparser import ResumeParser
+from resumeparser import ResumeParser, PARALLEL_MAX_WORKERS
 from llm import analyze_resume
+from text_cache import text_cache
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,6 +22,10 @@ logger = logging.getLogger("api")
 
 app = FastAPI(title="Resume Analyzer API")
 
+# Batch ranking (/analyze/batch)
+BATCH_MAX_FILES = int(os.getenv("RESUME_BATCH_MAX_FILES", 500))
+BATCH_LLM_CONCURRENCY = int(os.getenv("RESUME_BATCH_LLM_CONCURRENCY", 8))  # Simultaneous LLM calls per batch
+
 # Add CORS middleware to allow requests from frontend
 app.add_middleware(
     CORSMiddleware,
@@ -54,50 +63,140 @@ async def analyze_endpoint(
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF is supported.")
     
-    temp_filename = f"temp_{file.filename}"
-    
+    # 2. Read the upload into memory (no temp file, so concurrent uploads cannot collide)
+    pdf_bytes = await file.read()
+    logger.info(f"Received {file.filename} ({len(pdf_bytes)} bytes)")
+
+    # 3. Parse PDF (re-scoring the same PDF reuses its cached text)
+    parser = ResumeParser()
     try:
-        # 2. Save Uploaded File Temporarily
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        resume_text = await run_in_threadpool(text_cache.get_or_extract, pdf_bytes, parser.parse_bytes)
+    except Exception as e:
+        logger.error(f"Parsing error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {str(e)}")
         
-        logger.info(f"File saved to {temp_filename}")
+    if not resume_text:
+         raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
 
-        # 3. Parse PDF
-        parser = ResumeParser()
-        try:
-            resume_text = parser.parse(temp_filename)
-        except Exception as e:
-            logger.error(f"Parsing error: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {str(e)}")
-            
+    # 4. Analyze with LLM
+    logger.info("Analyzing with LLM...")
+    try:
+        result = analyze_resume(resume_text, job_description)
+        
+        logger.info(f"Analysis result type: {type(result)}")
+        if result is None:
+             raise ValueError("Internal Error: analyze_resume returned None")
+
+        # Handle potential error response from llm.py if it returned dict with error
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=f"AI Analysis failed: {result.get('error')}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Analysis error: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+async def _score_batch_item(index: int, file: UploadFile, job_description: str,
+                            extract_limit: asyncio.Semaphore, llm_limit: asyncio.Semaphore) -> dict:
+    """
+    Extracts and scores one resume of a batch. Errors are reported on the item, never raised.
+    """
+    item = {"index": index, "filename": file.filename}
+    try:
+        if file.content_type != "application/pdf":
+            raise ValueError("Invalid file type. Only PDF is supported.")
+        pdf_bytes = await file.read()
+
+        # Extraction runs on the parser's process pool; at most one PDF per pool worker is in flight
+        key = text_cache.key_for(pdf_bytes)
+        resume_text = await run_in_threadpool(text_cache.get, key)
+        if resume_text is None:
+            async with extract_limit:
+                resume_text = await asyncio.wrap_future(ResumeParser().submit_bytes(pdf_bytes))
+            if resume_text is not None:
+                await run_in_threadpool(text_cache.put, key, resume_text)
         if not resume_text:
-             raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
+            raise ValueError("Could not extract text from PDF.")
 
-        # 4. Analyze with LLM
-        logger.info("Analyzing with LLM...")
+        async with llm_limit:
+            result = await run_in_threadpool(analyze_resume, resume_text, job_description)
+        if result is None:
+            raise ValueError("Internal Error: analyze_resume returned None")
+        if "error" in result:
+            raise ValueError(f"AI Analysis failed: {result.get('error')}")
+
+        item["score"] = result["score"]
+        item["reasoning"] = result["reasoning"]
+        item["lexical_similarity"] = result.get("lexical_similarity")
+        item["prefiltered"] = result.get("prefiltered", False)
+    except Exception as e:
+        logger.error(f"Batch item {index} ({file.filename}) failed: {e}")
+        item["error"] = str(e)
+    return item
+
+@app.post("/analyze/batch")
+async def analyze_batch_endpoint(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(...)
+):
+    """
+    Ranks many resume PDFs against one job description.
+    Resumes are extracted in parallel on the parser's process pool (RESUME_PARALLEL_WORKERS
+    processes) and scored with at most BATCH_LLM_CONCURRENCY
+    LLM calls in flight. Streams NDJSON: one line per resume as it completes
+    ({"index", "filename", "score", "reasoning"} or {"index", "filename", "error"}),
+    then a {"summary": {...}} line with the ranking by score.
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_FILES} resumes per batch.")
+
+    extract_limit = asyncio.Semaphore(max(1, PARALLEL_MAX_WORKERS))
+    llm_limit = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+
+    async def _stream():
+        started = time.time()
+        tasks = [
+            asyncio.create_task(_score_batch_item(index, file, job_description, extract_limit, llm_limit))
+            for index, file in enumerate(files)
+        ]
+        scored = []
+        failed = 0
         try:
-            result = analyze_resume(resume_text, job_description)
-            
-            logger.info(f"Analysis result type: {type(result)}")
-            if result is None:
-                 raise ValueError("Internal Error: analyze_resume returned None")
-
-            # Handle potential error response from llm.py if it returned dict with error
-            if "error" in result:
-                raise HTTPException(status_code=500, detail=f"AI Analysis failed: {result.get('error')}")
-
-            return result
-
-        except Exception as e:
-            logger.error(f"Analysis error: {e}")
-            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
-
-    finally:
-        # 5. Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-            logger.info(f"Cleaned up {temp_filename}")
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                if "error" in item:
+                    failed += 1
+                else:
+                    scored.append(item)
+                yield json.dumps(item) + "\n"
+        finally:
+            # Client went away: stop scheduling the remaining resumes
+            for task in tasks:
+                task.cancel()
+
+        ranking = sorted(scored, key=lambda item: (-item["score"], item["index"]))
+        summary = {
+            "total": len(files),
+            "scored": len(scored),
+            "failed": failed,
+            "prefiltered": sum(1 for item in scored if item["prefiltered"]),
+            "seconds": round(time.time() - started, 3),
+            "ranking": [
+                {"rank": rank, "index": item["index"], "filename": item["filename"], "score": item["score"]}
+                for rank, item in enumerate(ranking, start=1)
+            ],
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters and size of the extracted-text cache.
+    """
+    return text_cache.stats()
 
 if __name__ == "__main__":
     import uvicorn
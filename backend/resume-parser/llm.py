@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from pydantic import BaseModel, Field
 
+from prefilter import prefilter
+
 # Load environment variables
 load_dotenv()
 
@@ -17,7 +19,15 @@ def analyze_resume(resume_text: str, job_description: str):
     """
     Analyzes a resume against a job description using an LLM.
     Returns: A dictionary (structured JSON) containing the score and reasoning.
+    Pairs with almost no keyword overlap are scored 0 locally (see prefilter.py) without an LLM call;
+    otherwise the overlap is passed to the model as a hint.
     """
+
+    # Local lexical gate: obvious domain mismatches never reach the LLM
+    lexical, verdict = prefilter(resume_text, job_description)
+    if verdict is not None:
+        print(f"DEBUG: Lexical pre-filter rejected pair (similarity {lexical['similarity']}), skipping LLM.")
+        return {**verdict, "lexical_similarity": lexical["similarity"], "prefiltered": True}
     
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
@@ -49,6 +59,11 @@ def analyze_resume(resume_text: str, job_description: str):
     )
 
     user_prompt = f"RESUME CONTENT:\n{resume_text}\n\nJOB DESCRIPTION:\n{job_description}"
+    if lexical["keywords"]:
+        user_prompt += (
+            f"\n\nKEYWORD OVERLAP HINT (automated, not evidence): similarity {lexical['similarity']:.2f} on a 0-1 scale; "
+            f"matched job keywords: {', '.join(lexical['matched']) or 'none'}."
+        )
 
     try:
         print("DEBUG: Sending request to LLM (via OpenAI Client)...")
@@ -78,7 +93,8 @@ def analyze_resume(resume_text: str, job_description: str):
                  parsed_response["score"] = 0
             if "reasoning" not in parsed_response:
                  parsed_response["reasoning"] = ["Analysis failed to produce reasoning."]
-                 
+
+            parsed_response["lexical_similarity"] = lexical["similarity"]
             return parsed_response
 
         except json.JSONDecodeError:
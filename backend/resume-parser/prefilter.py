@@ -0,0 +1,144 @@
+import os
+import re
+
+import numpy as np
+
+PREFILTER_ENABLED = os.getenv("LEXICAL_PREFILTER_ENABLED", "1") not in ("0", "false", "False")
+# Pairs at or below this similarity are rejected without an LLM call. The default 0 only
+# rejects resumes sharing no keyword with the JD; keyword overlap alone does not separate
+# domains, so set a higher value only from labeled resume/JD pairs.
+PREFILTER_THRESHOLD = float(os.getenv("LEXICAL_PREFILTER_THRESHOLD", 0.0))
+# Job descriptions with fewer distinct keywords than this are too thin to reject on
+PREFILTER_MIN_KEYWORDS = int(os.getenv("LEXICAL_PREFILTER_MIN_KEYWORDS", 8))
+BM25_K1 = 1.2
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Spellings of the same skill, mapped to one keyword before matching
+_PHRASE_ALIASES = [
+    (re.compile(r"\b(?:server[- ]side|back[- ]end)\b"), "backend"),
+    (re.compile(r"\b(?:client[- ]side|front[- ]end)\b"), "frontend"),
+    (re.compile(r"\bfull[- ]stack\b"), "fullstack"),
+    (re.compile(r"\bmachine learning\b"), "ml"),
+    (re.compile(r"\bci[/ -]cd\b"), "cicd"),
+]
+TOKEN_ALIASES = {
+    "golang": "go",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "k8s": "kubernetes",
+    "eks": "kubernetes",
+    "gke": "kubernetes",
+    "aks": "kubernetes",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "js": "javascript",
+    "ts": "typescript",
+    "mongo": "mongodb",
+}
+
+# Function words plus words every resume and job description uses, which say nothing about the domain
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could did do does
+each either etc for from had has have having he her his how i if in into is it its job may me more most
+must my no not of on or our out over own per she should so such than that the their them then there these
+they this those through to under up us very was we were what when where which while who will with within
+would you your
+ability able candidate candidates company environment excellent experience experienced good great ideal
+including join knowledge looking plus position preferred required requirements responsibilities role
+skill skills strong team teams work working year years
+""".split())
+
+def tokenize(text: str) -> list:
+    """
+    Lowercase skill/keyword tokens (keeps forms like c++, c#, node.js), stopwords removed
+    and aliases (golang, k8s, server-side, ...) mapped to one canonical keyword.
+    """
+    text = (text or "").lower()
+    for pattern, replacement in _PHRASE_ALIASES:
+        text = pattern.sub(replacement, text)
+    tokens = (TOKEN_ALIASES.get(token, token) for token in _TOKEN_RE.findall(text))
+    return [token for token in tokens if len(token) > 1 and token not in STOPWORDS]
+
+def _chunks(text: str) -> list:
+    return [line for line in (text or "").splitlines() if line.strip()]
+
+def lexical_similarity(resume_text: str, job_description: str) -> dict:
+    """
+    BM25-weighted share of the job description's keywords that appear in the resume, in [0, 1].
+
+    Each distinct JD keyword contributes idf * saturated term frequency in the resume
+    (BM25 with k1 = BM25_K1, no length normalization), divided by its best possible value.
+    IDF comes from the lines of both texts, so keywords repeated on every line
+    (boilerplate) weigh less than specific ones.
+    Returns the similarity, the number of distinct JD keywords and the highest-weighted
+    matched and missing keywords.
+    """
+    query = np.array(sorted(set(tokenize(job_description))))
+    if len(query) == 0:
+        return {"similarity": 0.0, "keywords": 0, "matched": [], "missing": []}
+
+    # Line x keyword presence matrix, built with one fancy-indexing assignment
+    chunks = _chunks(resume_text) + _chunks(job_description)
+    chunk_ids, term_ids = [], []
+    for chunk_index, chunk in enumerate(chunks):
+        tokens = np.array(tokenize(chunk))
+        if len(tokens) == 0:
+            continue
+        positions = np.searchsorted(query, tokens)
+        positions = np.minimum(positions, len(query) - 1)
+        hits = query[positions] == tokens
+        term_ids.append(positions[hits])
+        chunk_ids.append(np.full(int(hits.sum()), chunk_index))
+    presence = np.zeros((max(1, len(chunks)), len(query)), dtype=bool)
+    if term_ids:
+        presence[np.concatenate(chunk_ids), np.concatenate(term_ids)] = True
+
+    n_chunks = presence.shape[0]
+    df = presence.sum(axis=0)
+    idf = np.log(1.0 + (n_chunks - df + 0.5) / (df + 0.5))
+
+    resume_tokens = np.array(tokenize(resume_text))
+    tf = np.zeros(len(query))
+    if len(resume_tokens):
+        terms, counts = np.unique(resume_tokens, return_counts=True)
+        present = np.isin(terms, query)
+        tf[np.searchsorted(query, terms[present])] = counts[present]
+
+    saturated = tf * (BM25_K1 + 1.0) / (tf + BM25_K1)
+    similarity = float((idf * saturated).sum() / (idf.sum() * (BM25_K1 + 1.0)))
+
+    order = np.argsort(-idf, kind="stable")
+    found = tf[order] > 0
+    return {
+        "similarity": round(similarity, 4),
+        "keywords": int(len(query)),
+        "matched": query[order][found][:10].tolist(),
+        "missing": query[order][~found][:10].tolist(),
+    }
+
+def prefilter(resume_text: str, job_description: str, threshold: float = None):
+    """
+    Returns (similarity_info, verdict). `verdict` is a ready {score, reasoning} result when
+    the pair scores at or below the threshold (no keyword overlap at the default), otherwise None.
+    Job descriptions with fewer than PREFILTER_MIN_KEYWORDS keywords always pass through.
+    """
+    if threshold is None:
+        threshold = PREFILTER_THRESHOLD
+    info = lexical_similarity(resume_text, job_description)
+    if not PREFILTER_ENABLED or info["keywords"] < PREFILTER_MIN_KEYWORDS or info["similarity"] > threshold:
+        return info, None
+
+    missing = ", ".join(info["missing"][:5]) or "none"
+    verdict = {
+        "score": 0,
+        "reasoning": [
+            f"Domain mismatch: keyword similarity {info['similarity']:.4f} is at or below the {threshold:.4f} threshold.",
+            f"Key job description terms absent from the resume: {missing}.",
+        ],
+    }
+    return info, verdict
@@ -1,21 +1,88 @@
 import fitz  # PyMuPDF
+import os
 import sys
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, BinaryIO
 
 # Configure logging only if run directly, or let the app configure it.
 # We set a logger for this module.
 logger = logging.getLogger(__name__)
 
+# Bump when a change alters the extracted text (invalidates the text cache)
+PARSER_VERSION = "1"
+
+# Documents with at least this many pages are extracted on a process pool
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("RESUME_PARALLEL_PAGE_THRESHOLD", 20))
+PARALLEL_MAX_WORKERS = int(os.getenv("RESUME_PARALLEL_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Shared page-extraction pool, started on first use. 'spawn' keeps workers from
+    inheriting a forked copy of the server's threads and locks.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _open_pdf(source):
+    """Opens a PDF from a path or from in-memory bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+def _page_text(page) -> str:
+    """Layout-ordered text of one page ("" when it has no text blocks)."""
+    # distinct_text() or get_text("blocks") helps in layout preservation
+    # "blocks" returns a list of items: (x0, y0, x1, y1, "lines", block_no, block_type)
+    # block_type=0 is text, block_type=1 is image. We filter for text only.
+    blocks = page.get_text("blocks")
+    
+    # Sort blocks by vertical position (y0), then horizontal (x0) to handle columns
+    # This is critical for resumes which often have sidebars.
+    blocks.sort(key=lambda b: (b[1], b[0]))
+
+    page_text = []
+    for block in blocks:
+        # blocks structure in pymupdf: (x0, y0, x1, y1, content, block_no, block_type)
+        if block[6] == 0:  # block_type 0 is text
+            # The content in 'blocks' output (default) is already a string with newlines
+            text_content = block[4]
+            if text_content.strip():
+                page_text.append(text_content.strip())
+
+    return "\n".join(page_text)
+
+def _extract_page_range(source, start: int, end: int) -> list:
+    """Runs in a pool worker: texts of pages [start, end) in order."""
+    doc = _open_pdf(source)
+    try:
+        return [_page_text(doc[page_num]) for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+def _extract_document(source) -> str:
+    """Runs in a pool worker: the whole document's text, extracted sequentially."""
+    return ResumeParser(max_workers=1)._extract_text(source)
+
 class ResumeParser:
     """
     A lightweight, modern class to parse text from PDF resumes while preserving layout meaning.
     Uses PyMuPDF (fitz) for high-performance and accurate text extraction.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, parallel_threshold: int = PARALLEL_PAGE_THRESHOLD, max_workers: int = PARALLEL_MAX_WORKERS):
+        # Documents with fewer pages than `parallel_threshold` (or max_workers <= 1) are extracted in-process
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers
 
     def parse(self, file_path: str) -> Optional[str]:
         """
@@ -44,37 +111,77 @@ class ResumeParser:
             logger.error(f"Failed to parse PDF: {e}")
             raise
 
+    def parse_bytes(self, data: Union[bytes, bytearray, BinaryIO]) -> Optional[str]:
+        """
+        Parses a PDF held in memory (e.g. an upload) without writing it to disk.
+
+        Args:
+            data: The PDF content as bytes, or a binary file-like object to read it from.
+
+        Returns:
+            str: The extracted text, identical to parse() on the same file.
+        """
+        if hasattr(data, "read"):
+            data = data.read()
+        if not data:
+            logger.error("Empty PDF content.")
+            raise ValueError("PDF content is empty.")
+
+        try:
+            logger.info(f"Processing in-memory PDF ({len(data)} bytes)")
+            return self._extract_text(data)
+        except Exception as e:
+            logger.error(f"Failed to parse PDF: {e}")
+            raise
+
+    def submit_bytes(self, data: bytes) -> Future:
+        """
+        Queues extraction of an in-memory PDF on the shared process pool (PyMuPDF holds
+        the GIL, so threads would not run documents in parallel) and returns a future of
+        the same text parse_bytes() gives. The pool has `max_workers` processes.
+        """
+        if not data:
+            raise ValueError("PDF content is empty.")
+        return _get_pool(self.max_workers).submit(_extract_document, bytes(data))
+
     def _extract_text_from_pdf(self, path: Path) -> str:
         """Internal method to extract text using PyMuPDF with layout analysis."""
-        doc = fitz.open(path)
-        full_text = []
-
-        for page_num, page in enumerate(doc):
-            # distinct_text() or get_text("blocks") helps in layout preservation
-            # "blocks" returns a list of items: (x0, y0, x1, y1, "lines", block_no, block_type)
-            # block_type=0 is text, block_type=1 is image. We filter for text only.
-            blocks = page.get_text("blocks")
-            
-            # Sort blocks by vertical position (y0), then horizontal (x0) to handle columns
-            # This is critical for resumes which often have sidebars.
-            blocks.sort(key=lambda b: (b[1], b[0]))
-
-            page_text = []
-            for block in blocks:
-                # blocks structure in pymupdf: (x0, y0, x1, y1, content, block_no, block_type)
-                if block[6] == 0:  # block_type 0 is text
-                    # The content in 'blocks' output (default) is already a string with newlines
-                    text_content = block[4]
-                    if text_content.strip():
-                        page_text.append(text_content.strip())
-            
-            if page_text:
-                full_text.append("\n".join(page_text))
-            
-            logger.debug(f"Processed page {page_num + 1}/{len(doc)}")
+        return self._extract_text(path)
 
-        doc.close()
-        return "\n\n".join(full_text)
+    def _extract_text(self, source) -> str:
+        """
+        Extracts layout-ordered text from a PDF path or bytes.
+        Large documents are split into page ranges across the process pool; the pages
+        are reassembled in order, so the output is identical to the sequential path.
+        """
+        doc = _open_pdf(source)
+        page_count = len(doc)
+
+        if page_count < self.parallel_threshold or self.max_workers <= 1:
+            page_texts = []
+            for page_num, page in enumerate(doc):
+                page_texts.append(_page_text(page))
+                logger.debug(f"Processed page {page_num + 1}/{page_count}")
+            doc.close()
+        else:
+            doc.close()
+            page_texts = self._extract_parallel(source, page_count)
+
+        return "\n\n".join(text for text in page_texts if text)
+
+    def _extract_parallel(self, source, page_count: int) -> list:
+        workers = min(self.max_workers, page_count)
+        step = -(-page_count // workers)  # ceil
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        logger.info(f"Extracting {page_count} pages in {len(ranges)} parallel ranges")
+
+        pool = _get_pool(self.max_workers)
+        futures = [pool.submit(_extract_page_range, source, start, end) for start, end in ranges]
+
+        page_texts = []
+        for future in futures:
+            page_texts.extend(future.result())
+        return page_texts
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,163 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from resumeparser import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# In-memory tier: number of extracted texts kept
+MEMORY_MAX_ENTRIES = int(os.getenv("RESUME_TEXT_CACHE_SIZE", 256))
+# Optional on-disk tier, shared by every API worker process (unset = memory only)
+DISK_DIR = os.getenv("RESUME_TEXT_CACHE_DIR")
+DISK_MAX_BYTES = int(os.getenv("RESUME_TEXT_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+
+class TextCache:
+    """
+    Two-tier cache of extracted resume text, keyed by the PDF's SHA-256 plus PARSER_VERSION
+    (so a parser change never serves stale text).
+    Memory is an LRU of `memory_max_entries` texts. The optional disk tier stores one
+    file per key under `disk_dir` and evicts the least recently used files once they
+    exceed `disk_max_bytes`. Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory_max_entries: int = MEMORY_MAX_ENTRIES, disk_dir: Optional[str] = DISK_DIR,
+                 disk_max_bytes: int = DISK_MAX_BYTES):
+        self.memory_max_entries = memory_max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(pdf_bytes: bytes) -> str:
+        return f"{hashlib.sha256(pdf_bytes).hexdigest()}-v{PARSER_VERSION}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+
+        text = self._disk_get(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._memory_put(key, text)
+        return text
+
+    def put(self, key: str, text: str):
+        self._memory_put(key, text)
+        self._disk_put(key, text)
+
+    def get_or_extract(self, pdf_bytes: bytes, extract: Callable[[bytes], str]) -> str:
+        """
+        Returns the cached text for these PDF bytes, or runs `extract(pdf_bytes)` and caches it.
+        """
+        key = self.key_for(pdf_bytes)
+        text = self.get(key)
+        if text is None:
+            text = extract(pdf_bytes)
+            if text is not None:
+                self.put(key, text)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "parser_version": PARSER_VERSION,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.memory_max_entries,
+                "disk_enabled": bool(self.disk_dir),
+                "disk_bytes": self._disk_usage()[1] if self.disk_dir else 0,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_dir else 0,
+            }
+
+    def _memory_put(self, key: str, text: str):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # mtime doubles as the LRU clock
+            return text
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, text: str):
+        if not self.disk_dir:
+            return
+        encoded = text.encode("utf-8")
+        if len(encoded) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+            self._disk_evict()
+        except OSError as e:
+            logger.warning(f"Failed to write text cache entry: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _disk_usage(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".txt"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+        return entries, total
+
+    def _disk_evict(self):
+        entries, total = self._disk_usage()
+        if total <= self.disk_max_bytes:
+            return
+        for _, size, name in sorted(entries):
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_max_bytes:
+                break
+
+# Process-wide cache used by the API
+text_cache = TextCache()
@@ -0,0 +1,170 @@
+import os
+import sys
+import uuid
+import struct
+import hashlib
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    TEMP_VIDEO_DIR, ALLOWED_EXTENSIONS, MAX_VIDEO_DURATION,
+    MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE, HEADER_SNIFF_BYTES,
+)
+
+logger = logging.getLogger("ingest")
+
+# Top-level ISO-BMFF box types a .mp4/.mov file may start with
+_ISO_LEADING_BOXES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+class UploadRejected(Exception):
+    """Raised when an upload is aborted mid-stream; carries the HTTP status to return."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class IngestResult:
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+def check_extension(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise UploadRejected(400, f"Invalid file type. Allowed: {ALLOWED_EXTENSIONS}")
+    return ext
+
+def check_declared_size(content_length) -> None:
+    """
+    Rejects before reading a byte when the client already declares an oversized body.
+    """
+    if content_length is None:
+        return
+    try:
+        declared = int(content_length)
+    except (TypeError, ValueError):
+        raise UploadRejected(400, "Invalid Content-Length header.")
+    if declared < 0:
+        raise UploadRejected(400, "Invalid Content-Length header.")
+    if declared > MAX_UPLOAD_BYTES:
+        raise UploadRejected(413, f"Upload exceeds limit ({MAX_UPLOAD_BYTES} bytes).")
+
+def _check_magic(ext: str, head: bytes) -> None:
+    if ext in (".mp4", ".mov"):
+        valid = head[4:8] in _ISO_LEADING_BOXES
+    elif ext in (".mkv", ".webm"):
+        valid = head.startswith(_EBML_MAGIC)
+    elif ext == ".avi":
+        valid = head[:4] == b"RIFF" and head[8:12] == b"AVI "
+    else:
+        valid = False
+    if not valid:
+        raise UploadRejected(400, f"File content does not match a {ext} container.")
+
+def _iso_header_duration(head: bytes):
+    """
+    Reads the duration (seconds) from the 'mvhd' box when 'moov' sits fully inside `head`
+    (fast-start files). Returns None when it cannot be read from the header alone.
+    """
+    offset = 0
+    while offset + 8 <= len(head):
+        size, box_type = struct.unpack(">I4s", head[offset:offset + 8])
+        header_len = 8
+        if size == 1:
+            if offset + 16 > len(head):
+                return None
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+            header_len = 16
+        elif size == 0:
+            size = len(head) - offset  # box runs to end of file
+        if size < header_len:
+            return None
+
+        if box_type == b"moov":
+            if offset + size > len(head):
+                return None
+            moov = head[offset + header_len:offset + size]
+            idx = moov.find(b"mvhd")
+            if idx < 4:
+                return None
+            body = moov[idx + 4:]
+            version = body[0] if body else 0
+            if version == 1 and len(body) >= 32:
+                timescale, duration = struct.unpack(">IQ", body[20:32])
+            elif len(body) >= 20:
+                timescale, duration = struct.unpack(">II", body[12:20])
+            else:
+                return None
+            return duration / timescale if timescale else None
+
+        offset += size
+    return None
+
+def check_header(ext: str, head: bytes) -> None:
+    _check_magic(ext, head)
+    if ext in (".mp4", ".mov"):
+        duration = _iso_header_duration(head)
+        if duration is not None and duration > MAX_VIDEO_DURATION:
+            raise UploadRejected(400, f"Video duration ({duration:.2f}s) exceeds limit ({MAX_VIDEO_DURATION}s).")
+
+async def ingest_stream(chunks, ext: str) -> IngestResult:
+    """
+    Writes an async iterator of byte chunks straight into TEMP_VIDEO_DIR.
+
+    While streaming it computes the SHA-256 of the content, enforces MAX_UPLOAD_BYTES,
+    and checks the container header (magic bytes, and duration for fast-start MP4/MOV)
+    as soon as enough bytes have arrived. A rejected upload is aborted and its
+    partial file removed.
+    """
+    path = os.path.join(TEMP_VIDEO_DIR, f"{uuid.uuid4()}{ext}")
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    header_checked = False
+
+    out = open(path, "wb")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise UploadRejected(413, f"Upload exceeds limit ({MAX_UPLOAD_BYTES} bytes).")
+
+            if not header_checked:
+                head += chunk[:HEADER_SNIFF_BYTES - len(head)]
+                if len(head) >= HEADER_SNIFF_BYTES:
+                    check_header(ext, head)
+                    header_checked = True
+
+            hasher.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+
+        if size == 0:
+            raise UploadRejected(400, "Uploaded file is empty.")
+        if not header_checked:
+            check_header(ext, head)
+    except BaseException:
+        out.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    out.close()
+
+    logger.info(f"Ingested {size} bytes to {path} (sha256={hasher.hexdigest()[:12]}...)")
+    return IngestResult(path, size, hasher.hexdigest())
+
+async def iter_upload_file(file):
+    """
+    Adapts a FastAPI UploadFile into an async chunk iterator for ingest_stream.
+    """
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import logging
+from contextlib import contextmanager
+
+from fastapi.concurrency import run_in_threadpool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    TEMP_VIDEO_DIR, TEMP_UPLOAD_DIR, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE, HEADER_SNIFF_BYTES,
+    RESUMABLE_UPLOAD_TTL,
+)
+from api.ingest import UploadRejected, IngestResult, check_extension, check_declared_size, check_header
+from pipeline.file_lock import file_lock
+
+logger = logging.getLogger("resumable")
+
+class ResumableUploads:
+    """
+    Resumable uploads kept in TEMP_UPLOAD_DIR: `<id>.part` holds the bytes received so far
+    and `<id>.json` the upload's metadata. The size of the .part file is the upload offset,
+    so a client that lost its connection asks for the offset and continues from there.
+    Everything lives on disk, so any API worker process can serve any chunk; writes and
+    finalize hold a per-upload file lock (`<id>.lock`) across processes, and a request that
+    finds it held gets 409 and retries.
+    """
+
+    def __init__(self, directory=TEMP_UPLOAD_DIR, ttl: int = RESUMABLE_UPLOAD_TTL):
+        self.directory = str(directory)
+        self.ttl = ttl
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def _lock_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.lock")
+
+    @contextmanager
+    def _lock(self, upload_id: str):
+        """
+        Exclusive lock on an upload, shared by all API worker processes (409 if it is held).
+        The upload must exist first, so unknown ids never leave lock files behind.
+        """
+        self._meta(upload_id)
+        try:
+            with file_lock(self._lock_path(upload_id), blocking=False):
+                yield
+        except BlockingIOError:
+            raise UploadRejected(409, "Upload is busy with another request; retry.")
+
+    def create(self, filename: str, length=None) -> dict:
+        """
+        Starts an upload. `length` (total bytes) is optional; when given, finalize
+        refuses until exactly that many bytes have arrived.
+        """
+        ext = check_extension(filename)
+        if length is not None:
+            length = int(length)
+            if length <= 0:
+                raise UploadRejected(400, "Upload length must be positive.")
+            check_declared_size(length)
+
+        upload_id = uuid.uuid4().hex
+        meta = {"upload_id": upload_id, "filename": filename, "ext": ext, "length": length,
+                "created_at": time.time()}
+        open(self._part_path(upload_id), "wb").close()
+        with open(self._meta_path(upload_id), "w") as f:
+            json.dump(meta, f)
+        logger.info(f"Created resumable upload {upload_id} for {filename}")
+        return self.status(upload_id)
+
+    def _meta(self, upload_id: str) -> dict:
+        # ids are hex uuids; anything else never names a file of ours
+        if not upload_id.isalnum():
+            raise UploadRejected(404, "Upload not found or expired.")
+        try:
+            with open(self._meta_path(upload_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadRejected(404, "Upload not found or expired.")
+
+    def status(self, upload_id: str) -> dict:
+        """
+        Current offset (bytes received) of an upload.
+        """
+        meta = self._meta(upload_id)
+        part_path = self._part_path(upload_id)
+        try:
+            offset = os.path.getsize(part_path)
+            updated_at = os.path.getmtime(part_path)
+        except OSError:
+            raise UploadRejected(404, "Upload not found or expired.")
+        return {
+            "upload_id": upload_id,
+            "filename": meta["filename"],
+            "offset": offset,
+            "length": meta["length"],
+            "expires_at": updated_at + self.ttl,
+        }
+
+    async def append(self, upload_id: str, offset: int, chunks) -> dict:
+        """
+        Appends a chunk (async iterator of bytes) at `offset`, which must equal the current
+        offset (409 otherwise, so the client re-syncs). Bytes go straight onto the .part file;
+        if the connection drops mid-chunk, what arrived is kept and the offset reflects it.
+        """
+        with self._lock(upload_id):
+            meta = self._meta(upload_id)
+            current = self.status(upload_id)["offset"]
+            if offset != current:
+                raise UploadRejected(409, f"Offset mismatch: upload is at {current}.")
+
+            limit = meta["length"] or MAX_UPLOAD_BYTES
+            size = current
+            header_checked = current >= HEADER_SNIFF_BYTES
+            with open(self._part_path(upload_id), "ab") as out:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if size + len(chunk) > limit:
+                        raise UploadRejected(413, f"Upload exceeds its length ({limit} bytes).")
+                    await run_in_threadpool(out.write, chunk)
+                    size += len(chunk)
+
+                    if not header_checked and size >= HEADER_SNIFF_BYTES:
+                        await run_in_threadpool(out.flush)
+                        self._check_header(upload_id, meta)
+                        header_checked = True
+
+        return self.status(upload_id)
+
+    def _check_header(self, upload_id: str, meta: dict):
+        """
+        Rejects (and discards) an upload whose leading bytes are not a valid container.
+        """
+        with open(self._part_path(upload_id), "rb") as f:
+            head = f.read(HEADER_SNIFF_BYTES)
+        try:
+            check_header(meta["ext"], head)
+        except UploadRejected:
+            self.discard(upload_id)
+            raise
+
+    async def finalize(self, upload_id: str) -> IngestResult:
+        """
+        Completes an upload: verifies its length and header, hashes it, and moves it into
+        TEMP_VIDEO_DIR where the pipeline picks it up (and deletes it when done).
+        """
+        with self._lock(upload_id):
+            meta = self._meta(upload_id)
+            size = self.status(upload_id)["offset"]
+            if size == 0:
+                raise UploadRejected(400, "Uploaded file is empty.")
+            if meta["length"] is not None and size != meta["length"]:
+                raise UploadRejected(409, f"Upload incomplete: {size} of {meta['length']} bytes received.")
+            if size < HEADER_SNIFF_BYTES:
+                self._check_header(upload_id, meta)
+
+            sha256 = await run_in_threadpool(self._hash, upload_id)
+            path = os.path.join(TEMP_VIDEO_DIR, f"{uuid.uuid4()}{meta['ext']}")
+            os.replace(self._part_path(upload_id), path)
+            self.discard(upload_id)
+
+        logger.info(f"Finalized resumable upload {upload_id}: {size} bytes to {path}")
+        return IngestResult(path, size, sha256)
+
+    def _hash(self, upload_id: str) -> str:
+        hasher = hashlib.sha256()
+        with open(self._part_path(upload_id), "rb") as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def discard(self, upload_id: str):
+        for path in (self._part_path(upload_id), self._meta_path(upload_id), self._lock_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def collect_stale(self) -> int:
+        """
+        Removes uploads that have not received a chunk for `ttl` seconds. Returns how many.
+        """
+        now = time.time()
+        removed = 0
+        upload_ids = {
+            os.path.splitext(name)[0] for name in os.listdir(self.directory)
+            if name.endswith((".part", ".json", ".lock"))
+        }
+        for upload_id in upload_ids:
+            paths = [p for p in (self._part_path(upload_id), self._meta_path(upload_id), self._lock_path(upload_id))
+                     if os.path.exists(p)]
+            try:
+                updated_at = max(os.path.getmtime(p) for p in paths)
+            except (OSError, ValueError):
+                continue
+            if now - updated_at > self.ttl:
+                self.discard(upload_id)
+                removed += 1
+        if removed:
+            logger.info(f"Removed {removed} stale resumable uploads")
+        return removed
@@ -1,16 +1,31 @@
 import sys
 import os
+import json
+import time
+import queue
+import asyncio
+import hashlib
+from collections import deque
 
 # Add parent dir to sys.path to resolve generic imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-import shutil
-import uuid
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import logging
-from config import TEMP_VIDEO_DIR, ALLOWED_EXTENSIONS
-from pipeline.process_video import process_video_pipeline
+from api.ingest import (
+    UploadRejected, check_extension, check_declared_size, ingest_stream, iter_upload_file,
+)
+from api.resumable import ResumableUploads
+from pipeline.jobs import JobManager, QueueFullError
+from pipeline.result_cache import get_result_cache
+from pipeline.metrics import render_metrics, JOB_QUEUE_DEPTH
+from video.model_registry import load_model, is_ready
+from llm.transcription import get_backend
+from config import (
+    MAX_BATCH_VIDEOS, BATCH_GROUP_SIZE, BATCH_LOCAL_ROOT, UPLOAD_CHUNK_SIZE, RESUMABLE_GC_INTERVAL,
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -28,45 +43,441 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Worker pool for the async job API
+job_manager = JobManager()
+
+# Partial uploads for the resumable upload API
+resumable_uploads = ResumableUploads()
+
+@app.on_event("startup")
+def warm_models():
+    """
+    Loads and warms the detector once per worker process before serving traffic,
+    and starts the job pool (whose workers warm their own copy).
+    """
+    try:
+        load_model()
+    except Exception as e:
+        # Keep serving; /health stays 503 and the first request retries the load
+        logger.error(f"Model warmup failed: {e}")
+
+    try:
+        get_backend().warmup()
+    except Exception as e:
+        logger.error(f"Transcription backend warmup failed: {e}")
+
+    job_manager.start()
+
+async def _collect_stale_uploads():
+    while True:
+        try:
+            await run_in_threadpool(resumable_uploads.collect_stale)
+        except Exception as e:
+            logger.error(f"Stale upload cleanup failed: {e}")
+        await asyncio.sleep(RESUMABLE_GC_INTERVAL)
+
+@app.on_event("startup")
+async def start_upload_gc():
+    """
+    Periodically removes resumable uploads that were abandoned before finalize.
+    """
+    app.state.upload_gc = asyncio.create_task(_collect_stale_uploads())
+
+@app.on_event("shutdown")
+def stop_job_pool():
+    job_manager.shutdown()
+
+@app.get("/health")
+def health():
+    """
+    Readiness probe: healthy only after the detector and the job workers have been warmed up.
+    """
+    status = {
+        "model_ready": is_ready(),
+        "workers_ready": job_manager.is_ready(),
+        "queue_depth": job_manager.queue_depth(),
+    }
+    if not (status["model_ready"] and status["workers_ready"]):
+        return JSONResponse(status_code=503, content={"status": "loading", **status})
+    return {"status": "ok", **status}
+
+def _upload_error(e: UploadRejected) -> HTTPException:
+    logger.warning(f"Upload rejected: {e.detail}")
+    return HTTPException(status_code=e.status_code, detail=e.detail)
+
+async def _ingest(chunks, filename: str, content_length=None):
+    """
+    Streams an upload into temp storage, mapping ingest rejections to HTTP errors.
+    """
+    try:
+        ext = check_extension(filename)
+        check_declared_size(content_length)
+        return await ingest_stream(chunks, ext)
+    except UploadRejected as e:
+        raise _upload_error(e)
+
+async def _run_sync(video_path: str, content_hash: str = None):
+    """
+    Runs the pipeline on the job pool and waits for it, so synchronous requests share
+    JOB_WORKERS and the MAX_PENDING_JOBS limit with queued jobs (429 when full).
+    """
+    try:
+        future = job_manager.submit_for_result(video_path, content_hash)
+    except QueueFullError as e:
+        os.remove(video_path)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        logger.error(f"Job submission failed: {e}")
+        os.remove(video_path)
+        raise HTTPException(status_code=503, detail=str(e))
+
+    try:
+        result = (await asyncio.wrap_future(future))["result"]
+    except Exception as e:
+        # The worker died (or the pool is down) before the pipeline's own cleanup ran
+        logger.error(f"API Error: {e}")
+        if os.path.exists(video_path):
+            os.remove(video_path)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # If result["error"] is present, we still return the structure but might want to log it
+    if result.get("error"):
+        logger.warning(f"Pipeline reported error: {result['error']}")
+
+    return JSONResponse(content=result)
+
+def _check_queue_capacity():
+    # Reject before writing anything to disk when we already know there is no room
+    if not job_manager.has_capacity():
+        raise HTTPException(status_code=429, detail="Job queue is full. Retry later.",
+                            headers={"Retry-After": "5"})
+
+def _submit_job(video_path: str, content_hash: str = None) -> dict:
+    try:
+        job_id = job_manager.submit(video_path, content_hash)
+    except QueueFullError as e:
+        os.remove(video_path)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        logger.error(f"Job submission failed: {e}")
+        os.remove(video_path)
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_id": job_id, "status": "queued", "queue_depth": job_manager.queue_depth()}
+
 @app.post("/analyze-video")
 async def analyze_video_endpoint(file: UploadFile = File(...)):
     """
     Endpoint to upload and analyze an interview video.
     Returns: JSON with validity, ID card check, and scores.
+    Multipart uploads are spooled by FastAPI before this runs, so the file is written twice
+    and size/format checks only happen after the whole body arrived; prefer /analyze-video/stream.
     """
-    
-    # Basic extension check before saving
-    filename = file.filename
-    ext = os.path.splitext(filename)[1].lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {ALLOWED_EXTENSIONS}")
+    _check_queue_capacity()
+    upload = await _ingest(iter_upload_file(file), file.filename)
+    return await _run_sync(upload.path, upload.sha256)
 
-    # Generate unique filename
-    temp_filename = f"{uuid.uuid4()}{ext}"
-    temp_path = os.path.join(TEMP_VIDEO_DIR, temp_filename)
+@app.post("/analyze-video/stream")
+async def analyze_video_stream_endpoint(request: Request, filename: str, mode: str = "sync"):
+    """
+    Streaming variant: the raw request body is the video file (no multipart).
+    Chunks go straight to temp storage without FastAPI spooling the upload first,
+    and oversized or invalid files are aborted mid-upload.
+    mode=sync returns the analysis; mode=job queues it and returns a job id (202).
+    """
+    if mode not in ("sync", "job"):
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'job'.")
+    _check_queue_capacity()
 
+    upload = await _ingest(request.stream(), filename, request.headers.get("content-length"))
+
+    if mode == "job":
+        return JSONResponse(status_code=202, content=_submit_job(upload.path, upload.sha256))
+    return await _run_sync(upload.path, upload.sha256)
+
+@app.post("/analyze-video/jobs", status_code=202)
+async def submit_video_job(file: UploadFile = File(...)):
+    """
+    Queues an interview video for analysis on the worker pool.
+    Returns: job id immediately (202), or 429 when the queue is full.
+    Multipart, so spooled in full first like /analyze-video; /analyze-video/stream?mode=job streams.
+    """
+    _check_queue_capacity()
+    upload = await _ingest(iter_upload_file(file), file.filename)
+    return _submit_job(upload.path, upload.sha256)
+
+@app.get("/analyze-video/jobs/{job_id}")
+def get_video_job(job_id: str):
+    """
+    Returns the status of a queued job and, once done, its analysis result.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    job["queue_depth"] = job_manager.queue_depth()
+    return job
+
+@app.post("/uploads", status_code=201)
+def create_upload(filename: str, length: int = None):
+    """
+    Starts a resumable upload. Send the file with PUT /uploads/{id}?offset=N (raw chunk bodies),
+    check progress with GET /uploads/{id}, then POST /uploads/{id}/finalize to analyze it.
+    `length` (total bytes) is optional; if given, finalize waits for exactly that many bytes.
+    """
     try:
-        # Save file chunks to temp storage
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        logger.info(f"Video saved to {temp_path}")
-        
-        # Run Pipeline
-        result = process_video_pipeline(temp_path)
-        
-        # If result["error"] is present, we still return the structure but might want to log it
-        if result.get("error"):
-            logger.warning(f"Pipeline reported error: {result['error']}")
-
-        return JSONResponse(content=result)
+        return resumable_uploads.create(filename, length)
+    except UploadRejected as e:
+        raise _upload_error(e)
 
-    except Exception as e:
-        logger.error(f"API Error: {e}")
-        # Ensure cleanup if save failed midway
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        raise HTTPException(status_code=500, detail=str(e))
+@app.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    """
+    Returns the current offset, i.e. where the next chunk must start after a dropped connection.
+    """
+    try:
+        status = resumable_uploads.status(upload_id)
+    except UploadRejected as e:
+        raise _upload_error(e)
+    return JSONResponse(content=status, headers={"Upload-Offset": str(status["offset"])})
+
+@app.put("/uploads/{upload_id}")
+async def put_upload_chunk(upload_id: str, offset: int, request: Request):
+    """
+    Appends the raw request body at `offset` (409 with the real offset if it does not match).
+    """
+    try:
+        status = await resumable_uploads.append(upload_id, offset, request.stream())
+    except UploadRejected as e:
+        raise _upload_error(e)
+    return JSONResponse(content=status, headers={"Upload-Offset": str(status["offset"])})
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+def delete_upload(upload_id: str):
+    try:
+        resumable_uploads.status(upload_id)
+    except UploadRejected as e:
+        raise _upload_error(e)
+    resumable_uploads.discard(upload_id)
+
+@app.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str, mode: str = "sync"):
+    """
+    Completes a resumable upload and runs the pipeline on it.
+    mode=sync returns the analysis; mode=job queues it and returns a job id (202).
+    """
+    if mode not in ("sync", "job"):
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'job'.")
+    _check_queue_capacity()
+
+    try:
+        upload = await resumable_uploads.finalize(upload_id)
+    except UploadRejected as e:
+        raise _upload_error(e)
+
+    if mode == "job":
+        return JSONResponse(status_code=202, content=_submit_job(upload.path, upload.sha256))
+    return await _run_sync(upload.path, upload.sha256)
+
+def _hash_local_file(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+async def _batch_items(request: Request):
+    """
+    Turns a batch request into (source, item, error) triples, one per video.
+    Multipart bodies carry the videos as `files`; JSON bodies ({"paths": [...]}) name
+    files under BATCH_LOCAL_ROOT, which are analyzed in place and never deleted.
+    """
+    entries = []
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("application/json"):
+        if not BATCH_LOCAL_ROOT:
+            raise HTTPException(status_code=400, detail="Server-local paths are disabled (BATCH_LOCAL_ROOT is not set).")
+        try:
+            paths = (await request.json())["paths"]
+        except Exception:
+            raise HTTPException(status_code=400, detail='Expected a JSON body like {"paths": [...]}.')
+        if not isinstance(paths, list) or not paths:
+            raise HTTPException(status_code=400, detail="'paths' must be a non-empty list.")
+        if len(paths) > MAX_BATCH_VIDEOS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_VIDEOS} videos per batch.")
+
+        root = os.path.realpath(BATCH_LOCAL_ROOT)
+        for path in paths:
+            resolved = os.path.realpath(os.path.join(root, str(path)))
+            if os.path.commonpath([root, resolved]) != root:
+                entries.append((path, None, "Path is outside BATCH_LOCAL_ROOT."))
+                continue
+            try:
+                check_extension(resolved)
+                if not os.path.isfile(resolved):
+                    raise UploadRejected(404, "File not found.")
+                content_hash = await run_in_threadpool(_hash_local_file, resolved)
+            except UploadRejected as e:
+                entries.append((path, None, e.detail))
+                continue
+            entries.append((path, {"video_path": resolved, "content_hash": content_hash, "delete_video": False}, None))
+        return entries
+
+    form = await request.form()
+    files = form.getlist("files")
+    if not files:
+        raise HTTPException(status_code=400, detail="Send videos as multipart 'files' or a JSON list of 'paths'.")
+    if len(files) > MAX_BATCH_VIDEOS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_VIDEOS} videos per batch.")
+
+    try:
+        for file in files:
+            try:
+                ext = check_extension(file.filename)
+                upload = await ingest_stream(iter_upload_file(file), ext)
+            except UploadRejected as e:
+                entries.append((file.filename, None, e.detail))
+                continue
+            entries.append((file.filename, {"video_path": upload.path, "content_hash": upload.sha256}, None))
+    except BaseException:
+        _discard_items([item for _, item, _ in entries if item])
+        raise
+    return entries
+
+def _discard_items(items: list):
+    """
+    Removes uploads that will never reach the pipeline (which would otherwise delete them).
+    """
+    for item in items:
+        if item.get("delete_video", True) and os.path.exists(item["video_path"]):
+            os.remove(item["video_path"])
+
+@app.post("/analyze-video/batch")
+async def analyze_video_batch_endpoint(request: Request):
+    """
+    Analyzes many videos in one request: multipart `files`, or JSON {"paths": [...]} of server-local files.
+    Videos are split into groups of BATCH_GROUP_SIZE and scheduled on the worker pool; within a group,
+    sampled frames from all videos share detector batches.
+    Streams NDJSON: one {"index", "source", "result"} line per video as soon as that video
+    finishes (workers report each video through a progress queue), then a final {"summary": {...}} line.
+    """
+    entries = await _batch_items(request)
+    queued = [(index, item) for index, (_, item, _) in enumerate(entries) if item is not None]
+    groups = deque(queued[i:i + BATCH_GROUP_SIZE] for i in range(0, len(queued), BATCH_GROUP_SIZE))
+
+    def _line(index: int, result: dict) -> str:
+        return json.dumps({"index": index, "source": entries[index][0], "result": result}) + "\n"
+
+    async def _stream():
+        started = time.time()
+        counts = {"succeeded": 0, "failed": 0}
+        reported = set()
+        in_flight = {}
+
+        def _report(index: int, result: dict):
+            # A video can show up on the progress queue and in its group's result; report it once
+            if index in reported:
+                return None
+            reported.add(index)
+            counts["failed" if result.get("error") else "succeeded"] += 1
+            return _line(index, result)
+
+        try:
+            progress = job_manager.progress_queue()
+        except RuntimeError:
+            progress = None
+
+        def _next_progress(timeout: float):
+            try:
+                return progress.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        try:
+            for index, (_, item, error) in enumerate(entries):
+                if item is None:
+                    yield _report(index, {"video_valid": False, "error": error})
+
+            while groups or in_flight:
+                # Keep the pool fed without crowding out other clients' jobs
+                while groups and job_manager.has_capacity():
+                    group = groups.popleft()
+                    try:
+                        future = job_manager.submit_batch(
+                            [item for _, item in group], progress=progress, keys=[index for index, _ in group],
+                        )
+                    except QueueFullError:
+                        groups.appendleft(group)
+                        break
+                    except Exception as e:
+                        logger.error(f"Batch submission failed: {e}")
+                        _discard_items([item for _, item in group])
+                        for index, _ in group:
+                            yield _report(index, {"video_valid": False, "error": str(e)})
+                        continue
+                    in_flight[asyncio.wrap_future(future)] = group
+
+                if not in_flight:
+                    await asyncio.sleep(0.5)
+                    continue
+
+                if progress is not None:
+                    message = await run_in_threadpool(_next_progress, 0.5)
+                    while message is not None:
+                        line = _report(*message)
+                        if line:
+                            yield line
+                        message = await run_in_threadpool(_next_progress, 0)
+                else:
+                    await asyncio.wait(in_flight, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+
+                # Finished groups settle whatever the progress queue did not deliver
+                for future in [future for future in in_flight if future.done()]:
+                    group = in_flight.pop(future)
+                    try:
+                        results = future.result()["result"]
+                    except Exception as e:
+                        # The worker died mid-group; its finally-cleanup may not have run
+                        logger.error(f"Batch group failed: {e}")
+                        _discard_items([item for (index, item) in group if index not in reported])
+                        results = [{"video_valid": False, "error": str(e)} for _ in group]
+
+                    for (index, _), result in zip(group, results):
+                        line = _report(index, result)
+                        if line:
+                            yield line
+        finally:
+            # Client went away (or we failed) before these groups were submitted
+            for group in groups:
+                _discard_items([item for _, item in group])
+
+        summary = {
+            "total": len(entries),
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "seconds": round(time.time() - started, 3),
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters and size of the video result cache.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition: per-stage latency and frame-count histograms, job queue depth.
+    """
+    JOB_QUEUE_DEPTH.set(job_manager.queue_depth())
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
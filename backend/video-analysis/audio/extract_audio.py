@@ -1,21 +1,81 @@
-from moviepy.editor import VideoFileClip
+import io
 import os
+import sys
+import wave
+import subprocess
 
-def extract_audio(video_path: str, output_path: str) -> str:
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import AUDIO_SAMPLE_RATE
+from video.media_context import as_media_context
+
+def _ffmpeg_binary() -> str:
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+def extract_audio(media, output_path: str) -> str:
     """
     Extracts audio from video and saves it to output_path.
+    Accepts a MediaContext (already probed) or a file path.
+    Only the audio stream is demuxed; video frames are never decoded.
     Returns the path to the extracted audio file.
     """
     try:
+        media = as_media_context(media)
+        if not media.has_audio:
+            raise ValueError("Video has no audio track.")
+
         if os.path.exists(output_path):
             os.remove(output_path)
-            
-        with VideoFileClip(video_path) as video:
-            if video.audio is None:
-                raise ValueError("Video has no audio track.")
-            
-            video.audio.write_audiofile(output_path, verbose=False, logger=None)
-            
+
+        cmd = [
+            _ffmpeg_binary(), "-y", "-v", "error",
+            "-i", media.path,
+            "-vn", "-acodec", "pcm_s16le", "-ar", "44100",
+            output_path,
+        ]
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode(errors="replace").strip())
+
         return output_path
     except Exception as e:
         raise RuntimeError(f"Failed to extract audio: {e}")
+
+def extract_audio_pcm(media, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes the audio track straight into memory as mono 16-bit PCM at `sample_rate`
+    (16 kHz by default, what speech recognizers expect). No temp file is written.
+    Returns an int16 numpy array.
+    """
+    try:
+        media = as_media_context(media)
+        if not media.has_audio:
+            raise ValueError("Video has no audio track.")
+
+        cmd = [
+            _ffmpeg_binary(), "-v", "error",
+            "-i", media.path,
+            "-vn", "-ac", "1", "-ar", str(sample_rate),
+            "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+        ]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode(errors="replace").strip())
+
+        return np.frombuffer(proc.stdout, dtype=np.int16)
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract audio: {e}")
+
+def pcm_to_wav_bytes(pcm: np.ndarray, sample_rate: int = AUDIO_SAMPLE_RATE) -> bytes:
+    """
+    Wraps mono int16 PCM in an in-memory WAV container (for APIs that want a file upload).
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+    return buffer.getvalue()
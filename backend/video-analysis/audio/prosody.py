@@ -0,0 +1,113 @@
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    AUDIO_SAMPLE_RATE, PROSODY_FRAME_MS, PROSODY_SMOOTHING_MS, PROSODY_PEAK_DIP_DB, PROSODY_MIN_PEAK_GAP_MS,
+    VAD_MIN_SILENCE_MS,
+)
+from audio.vad import frame_energy_db, speech_mask, silence_runs
+
+def read_wav_pcm(path: str):
+    """
+    Reads a 16-bit WAV file into mono int16 PCM (channels averaged). Returns (pcm, sample_rate).
+    """
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV files are supported.")
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return pcm, sample_rate
+
+def _syllable_peaks(smoothed: np.ndarray, candidates: np.ndarray) -> list:
+    """
+    Keeps the local maxima that stand out as separate syllables: each must rise at least
+    PROSODY_PEAK_DIP_DB above the valley separating it from the previous syllable, and lie
+    PROSODY_MIN_PEAK_GAP_MS after it. Maxima failing either test belong to the previous
+    syllable, which keeps its highest point. A steady tone therefore yields no peaks.
+    """
+    min_gap = max(1, int(round(PROSODY_MIN_PEAK_GAP_MS / PROSODY_FRAME_MS)))
+    peaks = []
+    for index in candidates:
+        if not peaks:
+            if smoothed[index] - smoothed[:index + 1].min() >= PROSODY_PEAK_DIP_DB:
+                peaks.append(index)
+            continue
+        last = peaks[-1]
+        valley = smoothed[last:index + 1].min()
+        if (index - last >= min_gap and smoothed[last] - valley >= PROSODY_PEAK_DIP_DB
+                and smoothed[index] - valley >= PROSODY_PEAK_DIP_DB):
+            peaks.append(index)
+        elif smoothed[index] > smoothed[last]:
+            peaks[-1] = index
+    return peaks
+
+def prosody_features(audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> dict:
+    """
+    Delivery features from the extracted audio, computed in one vectorized pass over
+    PROSODY_FRAME_MS energy frames: speech/silence ratio, pauses between speech,
+    speaking rate (energy peaks per second of articulation time, a syllable-rate proxy) and
+    loudness stability. `audio` is mono int16 PCM or a path to a WAV file.
+    """
+    if isinstance(audio, str):
+        audio, sample_rate = read_wav_pcm(audio)
+
+    duration = len(audio) / float(sample_rate)
+    energy = frame_energy_db(audio, sample_rate, PROSODY_FRAME_MS)
+    mask = speech_mask(energy)
+    speech_frames = int(mask.sum())
+
+    features = {
+        "duration_seconds": round(duration, 2),
+        "speech_seconds": 0.0,
+        "speech_ratio": 0.0,
+        "pause_count": 0,
+        "mean_pause_seconds": 0.0,
+        "longest_pause_seconds": 0.0,
+        "pauses_per_minute": 0.0,
+        "syllables_per_second": 0.0,
+        "mean_loudness_db": None,
+        "loudness_std_db": None,
+    }
+    if speech_frames == 0:
+        return features
+
+    frame_seconds = PROSODY_FRAME_MS / 1000.0
+    speech_seconds = speech_frames * frame_seconds
+
+    # Pauses are silences between speech; leading and trailing silence is not a pause
+    speech_idx = np.flatnonzero(mask)
+    inner = mask[speech_idx[0]:speech_idx[-1] + 1]
+    runs = silence_runs(inner, max(1, int(VAD_MIN_SILENCE_MS / PROSODY_FRAME_MS)))
+    pause_lengths = (runs[:, 1] - runs[:, 0]) * frame_seconds
+    # Speaking time excluding pauses. The energy dips between syllables fall outside the
+    # speech mask, so counting mask frames alone would overstate the rate.
+    articulation_seconds = len(inner) * frame_seconds - float(pause_lengths.sum())
+
+    # Syllable nuclei show up as local energy maxima inside speech; smoothing over
+    # PROSODY_SMOOTHING_MS keeps frame-level jitter from adding peaks
+    window = max(3, int(round(PROSODY_SMOOTHING_MS / PROSODY_FRAME_MS)) | 1)
+    smoothed = np.convolve(energy, np.ones(window) / float(window), mode="same")
+    middle = smoothed[1:-1]
+    candidates = np.flatnonzero((middle > smoothed[:-2]) & (middle >= smoothed[2:]) & mask[1:-1]) + 1
+    syllable_count = len(_syllable_peaks(smoothed, candidates))
+
+    speech_energy = energy[mask]
+    features.update({
+        "speech_seconds": round(speech_seconds, 2),
+        "speech_ratio": round(speech_frames / float(len(mask)), 3),
+        "pause_count": int(len(pause_lengths)),
+        "mean_pause_seconds": round(float(pause_lengths.mean()), 2) if len(pause_lengths) else 0.0,
+        "longest_pause_seconds": round(float(pause_lengths.max()), 2) if len(pause_lengths) else 0.0,
+        "pauses_per_minute": round(len(pause_lengths) * 60.0 / duration, 1) if duration else 0.0,
+        "syllables_per_second": round(syllable_count / articulation_seconds, 2),
+        "mean_loudness_db": round(float(speech_energy.mean()), 1),
+        "loudness_std_db": round(float(speech_energy.std()), 1),
+    })
+    return features
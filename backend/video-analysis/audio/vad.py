@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    AUDIO_SAMPLE_RATE, VAD_FRAME_MS, VAD_MIN_SILENCE_MS, VAD_MAX_CHUNK_SECONDS,
+    VAD_ENERGY_FLOOR_DB, VAD_NOISE_MARGIN_DB,
+)
+
+def frame_energy_db(pcm: np.ndarray, sample_rate: int = AUDIO_SAMPLE_RATE, frame_ms: int = VAD_FRAME_MS) -> np.ndarray:
+    """
+    RMS energy (dBFS) of consecutive non-overlapping frames of int16 PCM.
+    A trailing partial frame is ignored.
+    """
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(pcm) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = pcm[:n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+def speech_mask(energy_db: np.ndarray) -> np.ndarray:
+    """
+    Marks frames as speech when they are louder than both the absolute floor and
+    the clip's own noise floor (10th percentile) plus a margin.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    threshold = max(VAD_ENERGY_FLOOR_DB, float(np.percentile(energy_db, 10)) + VAD_NOISE_MARGIN_DB)
+    return energy_db > threshold
+
+def silence_runs(mask: np.ndarray, min_frames: int) -> np.ndarray:
+    """
+    Returns an (N, 2) array of [start, end) frame ranges of silence at least `min_frames` long.
+    """
+    silent = np.concatenate(([0], (~mask).astype(np.int8), [0]))
+    edges = np.diff(silent)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    runs = np.stack((starts, ends), axis=1) if len(starts) else np.zeros((0, 2), dtype=np.int64)
+    return runs[(runs[:, 1] - runs[:, 0]) >= min_frames]
+
+def segment_speech(pcm: np.ndarray, sample_rate: int = AUDIO_SAMPLE_RATE,
+                   max_chunk_seconds: float = VAD_MAX_CHUNK_SECONDS) -> list:
+    """
+    Splits int16 PCM at silences into chunks no longer than `max_chunk_seconds`.
+    Each chunk ends in the middle of the latest long-enough pause that fits; if a
+    stretch has no pause, it is cut at the limit. Chunks with no speech are dropped.
+    Returns a list of (start_sample, end_sample) pairs in order.
+    """
+    frame_len = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    energy = frame_energy_db(pcm, sample_rate)
+    mask = speech_mask(energy)
+    n_frames = len(mask)
+    if n_frames == 0:
+        return [(0, len(pcm))] if len(pcm) else []
+
+    min_silence = max(1, int(VAD_MIN_SILENCE_MS / VAD_FRAME_MS))
+    max_frames = max(1, int(max_chunk_seconds * 1000 / VAD_FRAME_MS))
+    runs = silence_runs(mask, min_silence)
+    cut_points = (runs[:, 0] + runs[:, 1]) // 2
+
+    segments = []
+    start = 0
+    while start < n_frames:
+        limit = start + max_frames
+        if limit >= n_frames:
+            end = n_frames
+        else:
+            candidates = cut_points[(cut_points > start) & (cut_points <= limit)]
+            end = int(candidates[-1]) if len(candidates) else limit
+
+        if mask[start:end].any():
+            end_sample = len(pcm) if end == n_frames else end * frame_len
+            segments.append((start * frame_len, end_sample))
+        start = end
+
+    return segments
@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add parent dir to sys.path to resolve generic imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ID_CARD_CONFIDENCE_THRESHOLD, DETECTION_BATCH_SIZE
+from video.frame_sampler import FrameSampler
+from video.media_context import MediaContext
+from video.model_registry import create_detector, warmup
+from video.id_card_yolo import predict, TARGET_CLASSES
+from video.scene_gate import downscale_for_inference
+
+def _sampled_frames(video_path: str) -> list:
+    media = MediaContext.probe(video_path)
+    cap = media.open_capture()
+    try:
+        return [downscale_for_inference(frame) for _, frame in FrameSampler(cap, fps=media.fps)]
+    finally:
+        cap.release()
+
+def _best_target_conf(frame_detections) -> float:
+    return max((conf for cls_id, conf in frame_detections if cls_id in TARGET_CLASSES), default=0.0)
+
+def _run(detector, frames: list, batch_size: int):
+    """
+    Returns (per-frame best target confidence, seconds).
+    """
+    confidences = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        confidences.extend(_best_target_conf(d) for d in predict(detector, frames[i:i + batch_size]))
+    return confidences, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy/throughput parity: ultralytics vs ONNX Runtime detector.")
+    parser.add_argument("videos", nargs="+", help="Sample interview videos")
+    parser.add_argument("--batch-size", type=int, default=DETECTION_BATCH_SIZE)
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Allowed per-frame confidence difference")
+    args = parser.parse_args()
+
+    frames = [frame for video in args.videos for frame in _sampled_frames(video)]
+    if not frames:
+        sys.exit("No frames sampled from the given videos.")
+
+    results = {}
+    for backend in ("ultralytics", "onnx"):
+        detector = create_detector(backend)
+        warmup(detector)
+        confidences, seconds = _run(detector, frames, args.batch_size)
+        results[backend] = {"confidences": confidences, "seconds": seconds}
+
+    reference = results["ultralytics"]["confidences"]
+    candidate = results["onnx"]["confidences"]
+    diffs = [abs(a - b) for a, b in zip(reference, candidate)]
+    agree = sum(
+        (a >= ID_CARD_CONFIDENCE_THRESHOLD) == (b >= ID_CARD_CONFIDENCE_THRESHOLD)
+        for a, b in zip(reference, candidate)
+    )
+
+    report = {
+        "frames": len(frames),
+        "batch_size": args.batch_size,
+        "max_conf_diff": max(diffs),
+        "mean_conf_diff": sum(diffs) / len(diffs),
+        "frames_over_tolerance": sum(d > args.tolerance for d in diffs),
+        "decision_agreement": agree / len(frames),
+        "video_max_conf": {"ultralytics": max(reference), "onnx": max(candidate)},
+        "frames_per_sec": {
+            backend: len(frames) / data["seconds"] for backend, data in results.items()
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    if report["frames_over_tolerance"] or report["decision_agreement"] < 1.0:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
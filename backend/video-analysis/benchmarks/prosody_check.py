@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+import argparse
+
+import numpy as np
+
+# Add parent dir to sys.path to resolve generic imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import AUDIO_SAMPLE_RATE
+from audio.prosody import prosody_features
+
+def _tone(seconds: float, sample_rate: int, rng) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return 0.5 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 0.002, len(t))
+
+def steady_tone(seconds: float, sample_rate: int, rng) -> np.ndarray:
+    """
+    A constant 220 Hz tone: no syllables at all.
+    """
+    return (_tone(seconds, sample_rate, rng) * 32767).astype(np.int16)
+
+def syllabic_tone(rate: float, seconds: float, sample_rate: int, rng) -> np.ndarray:
+    """
+    A tone whose loudness pulses `rate` times per second, with a leading silence and
+    three pauses, standing in for speech at a known syllable rate.
+    """
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = (0.5 + 0.5 * np.sin(2 * np.pi * rate * t)) ** 2
+    signal = envelope * _tone(seconds, sample_rate, rng)
+    for start, end in ((0, 1), (5, 6), (12, 12.8), (20, 22)):
+        signal[int(start * sample_rate):int(end * sample_rate)] = 0
+    signal += rng.normal(0, 0.002, len(signal))
+    return (signal * 32767).astype(np.int16)
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks the syllable-rate estimate on synthetic signals of known rate.")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative error of the rate")
+    parser.add_argument("--max-tone-rate", type=float, default=0.2, help="Allowed rate for a steady tone")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sample_rate = AUDIO_SAMPLE_RATE
+    report = {"steady_tone": prosody_features(steady_tone(args.seconds, sample_rate, rng), sample_rate)["syllables_per_second"]}
+    failed = report["steady_tone"] > args.max_tone_rate
+
+    for rate in (3, 4, 5, 6):
+        measured = prosody_features(syllabic_tone(rate, args.seconds, sample_rate, rng), sample_rate)["syllables_per_second"]
+        report[f"{rate}_per_second"] = measured
+        failed |= abs(measured - rate) > args.tolerance * rate
+
+    print(json.dumps(report, indent=2))
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
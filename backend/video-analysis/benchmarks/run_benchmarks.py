@@ -0,0 +1,237 @@
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+import cv2
+import numpy as np
+
+# Add parent dir to sys.path to resolve generic imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic video matrix: (width, height, fps, seconds, with_audio)
+FULL_MATRIX = [
+    (640, 360, 15, 10, True),
+    (640, 360, 30, 30, True),
+    (1280, 720, 30, 30, True),
+    (1280, 720, 30, 60, True),
+    (1920, 1080, 30, 30, True),
+    (1280, 720, 30, 30, False),
+]
+QUICK_MATRIX = [
+    (640, 360, 30, 5, True),
+    (640, 360, 30, 5, False),
+]
+
+def _ffmpeg_binary() -> str:
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+def generate_video(path: str, width: int, height: int, fps: int, seconds: int, with_audio: bool):
+    """
+    Writes a deterministic synthetic clip: a static background with a slowly moving block
+    (a stand-in for a talking head), plus a tone-and-pause audio track when requested.
+    """
+    silent_path = path if not with_audio else path + ".noaudio.mp4"
+    writer = cv2.VideoWriter(silent_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    background = np.full((height, width, 3), 60, dtype=np.uint8)
+    block = max(8, min(width, height) // 4)
+    for i in range(fps * seconds):
+        frame = background.copy()
+        x = int((width - block) * (0.5 + 0.4 * np.sin(i / (fps * 2.0))))
+        y = (height - block) // 2
+        frame[y:y + block, x:x + block] = (180, 140, 120)
+        writer.write(frame)
+    writer.release()
+
+    if with_audio:
+        # 1.5s tone / 0.5s pause pattern so the VAD has something to segment
+        tone = f"sine=frequency=220:sample_rate=44100:duration={seconds}"
+        cmd = [
+            _ffmpeg_binary(), "-y", "-v", "error",
+            "-i", silent_path, "-f", "lavfi", "-i", tone,
+            "-filter:a", "volume='if(lt(mod(t,2),1.5),1,0)':eval=frame",
+            "-shortest", "-c:v", "copy", "-c:a", "aac", path,
+        ]
+        subprocess.run(cmd, check=True)
+        os.remove(silent_path)
+
+def _peak_rss_mb():
+    """
+    Peak resident memory of this process in MiB, or None where it cannot be measured.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _best_of(fn, repeats: int):
+    best, value = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+def _stub_analyze(audio, sample_rate=None, timer=None, duration=None, prosody=None):
+    """
+    Local stand-in for analyze_audio_content: real VAD/transcription flow on the stub ASR backend,
+    fixed scores instead of the LLM call.
+    """
+    from config import AUDIO_SAMPLE_RATE
+    from llm.transcription import transcribe_audio, get_backend
+    from pipeline.metrics import timed
+
+    with timed(timer, "transcribe"):
+        transcript = transcribe_audio(audio, sample_rate or AUDIO_SAMPLE_RATE, backend=get_backend("stub"))
+    with timed(timer, "score"):
+        scores = {"audio_score": 5, "final_score": 5}
+    return {"transcript": transcript, **scores}
+
+def run_case(video_path: str, repeats: int) -> dict:
+    """
+    Benchmarks every stage on one video. Runs in its own process so peak RSS is per case.
+    """
+    from config import TEMP_AUDIO_DIR
+    from video.media_context import MediaContext
+    from video.validate_video import validate_video
+    from video.id_card_yolo import detect_id_card
+    from video.model_registry import load_model
+    from audio.extract_audio import extract_audio, extract_audio_pcm
+    from audio.prosody import prosody_features
+    from pipeline.metrics import StageTimer
+    import pipeline.process_video as process_video
+
+    stages = {}
+
+    start = time.perf_counter()
+    model = load_model()
+    stages["model_load"] = {"seconds": time.perf_counter() - start}
+
+    seconds, media = _best_of(lambda: MediaContext.probe(video_path), repeats)
+    stages["probe"] = {"seconds": seconds}
+
+    seconds, _ = _best_of(lambda: validate_video(video_path), repeats)
+    stages["validate_video"] = {"seconds": seconds}
+
+    seconds, detection = _best_of(lambda: detect_id_card(media, model=model), repeats)
+    stages["detect_id_card"] = {
+        "seconds": seconds,
+        "frames_decoded": detection["frames_decoded"],
+        "frames_skipped": detection["frames_skipped"],
+        "frames_inferred": detection["frames_inferred"],
+        "video_frames_per_sec": media.frame_total / seconds if seconds else None,
+        "inferred_frames_per_sec": detection["frames_inferred"] / seconds if seconds else None,
+    }
+
+    if media.has_audio:
+        audio_path = os.path.join(TEMP_AUDIO_DIR, f"bench-{os.getpid()}.wav")
+        seconds, _ = _best_of(lambda: extract_audio(media, audio_path), repeats)
+        stages["extract_audio_file"] = {"seconds": seconds, "bytes": os.path.getsize(audio_path)}
+        os.remove(audio_path)
+
+        seconds, pcm = _best_of(lambda: extract_audio_pcm(media), repeats)
+        stages["extract_audio_pcm"] = {"seconds": seconds, "bytes": int(pcm.nbytes)}
+
+        seconds, _ = _best_of(lambda: prosody_features(pcm), repeats)
+        stages["prosody_features"] = {"seconds": seconds}
+
+    # Full pipeline with the LLM/ASR replaced by the local stub; it deletes its input, so run on copies
+    process_video.analyze_audio_content = _stub_analyze
+    best, pipeline_stages, error = float("inf"), {}, None
+    for _ in range(repeats):
+        copy_path = video_path + f".run{os.getpid()}" + os.path.splitext(video_path)[1]
+        shutil.copyfile(video_path, copy_path)
+        timer = StageTimer()
+        start = time.perf_counter()
+        result = process_video.process_video_pipeline(copy_path, timer=timer)
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best, pipeline_stages, error = elapsed, timer.stages(), result.get("error")
+    stages["process_video_pipeline"] = {"seconds": best, "stages": pipeline_stages, "error": error}
+
+    return {"stages": stages, "peak_rss_mb": _peak_rss_mb()}
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the video analysis pipeline on synthetic videos.")
+    parser.add_argument("-o", "--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="Two short clips instead of the full matrix")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per stage; the best time is reported")
+    parser.add_argument("--keep-videos", help="Generate videos into this directory and keep them")
+    args = parser.parse_args()
+
+    import config
+
+    matrix = QUICK_MATRIX if args.quick else FULL_MATRIX
+    video_dir = args.keep_videos or tempfile.mkdtemp(prefix="video-bench-")
+    os.makedirs(video_dir, exist_ok=True)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            name: getattr(config, name) for name in (
+                "FRAME_SAMPLING_MODE", "FRAME_SAMPLE_RATE", "DETECTION_BATCH_SIZE",
+                "SCENE_CHANGE_GATE", "INFERENCE_IMAGE_SIZE",
+                "AUDIO_EXTRACTION_MODE", "YOLO_MODEL_PATH",
+            ) if hasattr(config, name)
+        },
+        "cases": [],
+    }
+
+    # One fresh process per case: isolates peak RSS and keeps runs independent
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for width, height, fps, seconds, with_audio in matrix:
+            name = f"{width}x{height}_{fps}fps_{seconds}s_{'audio' if with_audio else 'noaudio'}"
+            video_path = os.path.join(video_dir, f"{name}.mp4")
+            if not os.path.exists(video_path):
+                generate_video(video_path, width, height, fps, seconds, with_audio)
+            print(f"Benchmarking {name}...", file=sys.stderr)
+
+            with ctx.Pool(1) as pool:
+                case = pool.apply(run_case, (video_path, args.repeats))
+            case["video"] = {
+                "name": name, "width": width, "height": height, "fps": fps,
+                "seconds": seconds, "audio": with_audio, "bytes": os.path.getsize(video_path),
+            }
+            report["cases"].append(case)
+    finally:
+        if not args.keep_videos:
+            shutil.rmtree(video_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
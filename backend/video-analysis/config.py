@@ -11,22 +11,97 @@ load_dotenv(BASE_DIR / ".env")
 # Temporary Directories
 TEMP_VIDEO_DIR = BASE_DIR / "temp" / "video"
 TEMP_AUDIO_DIR = BASE_DIR / "temp" / "audio"
+TEMP_UPLOAD_DIR = BASE_DIR / "temp" / "uploads"  # Partial resumable uploads
 
 # Ensure temp directories exist
 TEMP_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
 TEMP_AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+TEMP_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # Constraints
-MAX_VIDEO_DURATION = 60  # seconds
+MAX_VIDEO_DURATION = int(os.environ.get("MAX_VIDEO_DURATION", 300))  # seconds; long answers are transcribed in VAD chunks
 ALLOWED_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.webm'}
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024  # Uploads are aborted once they pass this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes read per chunk while ingesting
+HEADER_SNIFF_BYTES = 256 * 1024  # Leading bytes buffered to check the container header
+RESUMABLE_UPLOAD_TTL = 3600  # seconds without a new chunk before a partial upload is garbage-collected
+RESUMABLE_GC_INTERVAL = 300  # seconds between sweeps for stale partial uploads
+
+# Job Queue (async /analyze-video/jobs)
+JOB_WORKERS = int(os.environ.get("VIDEO_JOB_WORKERS", 2))  # Worker processes, each with its own warm model
+MAX_PENDING_JOBS = 16  # Queued + running jobs before new submissions get 429
+JOB_RESULT_TTL = 600  # seconds a finished job's result stays available
+
+# Batch Analysis (/analyze-video/batch)
+MAX_BATCH_VIDEOS = 500  # Videos accepted per batch request
+BATCH_GROUP_SIZE = 4  # Videos per worker task; their sampled frames share detector batches
+BATCH_AUDIO_PARALLELISM = 4  # Concurrent audio/LLM branches inside one group
+# Directory server-local paths must live under (unset = only uploads are accepted)
+BATCH_LOCAL_ROOT = os.environ.get("BATCH_LOCAL_ROOT")
+
+# Result Cache (keyed by video content hash; stores scores/transcript only, never media)
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_PATH = BASE_DIR / "cache" / "results.sqlite3"
+RESULT_CACHE_MAX_ENTRIES = 5000
+RESULT_CACHE_TTL = 7 * 24 * 3600  # seconds
+PIPELINE_VERSION = "3"  # Bump when a pipeline change should invalidate cached results
 
 # Paths
 # Using standard YOLOv8n model, will be downloaded automatically by ultralytics if not present
 YOLO_MODEL_PATH = "yolov8n.pt" 
+YOLO_WARMUP_IMGSZ = 640  # Size of the blank frame used for the startup warmup inference
+# Detector backend: "ultralytics" (PyTorch weights) or "onnx" (ONNX Runtime on CPU, pip install onnxruntime;
+# the ONNX file is exported from YOLO_MODEL_PATH on first use if missing, or ahead of time with
+# python video/onnx_detector.py)
+DETECTOR_BACKEND = os.environ.get("DETECTOR_BACKEND", "ultralytics")
+ONNX_MODEL_PATH = "yolov8n.onnx"
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", 2))  # Keep JOB_WORKERS x threads <= cores
 
 # API Keys
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Audio Settings
+AUDIO_EXTRACTION_MODE = "memory"  # "memory" (16 kHz mono PCM buffer) or "file" (full-rate WAV on disk)
+AUDIO_SAMPLE_RATE = 16000  # Hz, for the in-memory buffer
+
+# Transcription Settings
+# "remote" (OpenAI Whisper, Google Web Speech fallback), "local" (offline faster-whisper on CPU,
+# pip install faster-whisper) or "stub" (fixed text, for tests/benchmarks)
+TRANSCRIPTION_BACKEND = os.environ.get("TRANSCRIPTION_BACKEND", "remote")
+LOCAL_ASR_MODEL = os.environ.get("LOCAL_ASR_MODEL", "base.en")
+LOCAL_ASR_COMPUTE_TYPE = "int8"
+LOCAL_ASR_THREADS = 0  # 0 = let CTranslate2 pick
+STUB_TRANSCRIPT = "This is a deterministic stub transcript used for testing the video analysis pipeline."
+TRANSCRIPTION_PARALLELISM = 4  # Concurrent transcription calls per clip
+VAD_FRAME_MS = 30  # Energy frame length for voice-activity detection
+VAD_MIN_SILENCE_MS = 300  # Pauses at least this long are candidate split points
+VAD_MAX_CHUNK_SECONDS = 20  # Upper bound on a transcription chunk
+VAD_ENERGY_FLOOR_DB = -45  # dBFS; quieter frames are always silence
+VAD_NOISE_MARGIN_DB = 10  # Speech must be this far above the clip's noise floor
+
+# Prosody Features (pauses, pacing, loudness; returned with the scores and given to the scoring prompt)
+PROSODY_ENABLED = True
+PROSODY_FRAME_MS = 10  # Energy frame length; finer than VAD_FRAME_MS so syllable peaks stay visible
+PROSODY_SMOOTHING_MS = 50  # Energy is averaged over this window before counting syllable peaks
+PROSODY_PEAK_DIP_DB = 2.0  # A syllable peak must rise this far above the valley before it
+PROSODY_MIN_PEAK_GAP_MS = 100  # Minimum spacing of syllable peaks
+
+# Transcript pre-scoring (clear-cut answers are scored locally, skipping the LLM call)
+PRESCORE_ENABLED = True
+PRESCORE_MIN_WORDS = 20  # Answers shorter than this fail without an LLM call (same rule as the prompt)
+PRESCORE_MAX_FILLER_RATIO = 0.5  # Share of filler words ("um", "you know", ...) above which an answer fails
+
 # Processing Settings
 ID_CARD_CONFIDENCE_THRESHOLD = 0.3
+FRAME_SAMPLING_MODE = "stride"  # "stride" (every Nth frame), "fps" (N per second of video), "budget" (K per clip)
 FRAME_SAMPLE_RATE = 10  # Process every 10th frame for speed
+FRAME_SAMPLE_FPS = 1.0  # Frames per second of video in "fps" mode
+FRAME_SAMPLE_BUDGET = 30  # Frames per clip in "budget" mode
+FRAME_SEEK_MIN_GAP = 120  # Seek instead of grab()-ing when skipping at least this many frames
+DETECTION_BATCH_SIZE = 8  # Sampled frames per detector call (1 = frame-by-frame)
+DETECTION_PIPELINING = True  # Decode on a separate thread, overlapping with inference
+FRAME_RING_SIZE = 16  # Preallocated frames between the decoder thread and inference (at least 2 batches)
+SCENE_CHANGE_GATE = True  # Skip sampled frames nearly identical to the last inferred one
+SCENE_CHANGE_THRESHOLD = 0.02  # Mean abs difference (0-1) of grayscale thumbnails needed to re-run detection
+SCENE_THUMBNAIL_WIDTH = 64  # px, thumbnail used by the scene-change gate
+INFERENCE_IMAGE_SIZE = 640  # Longest side of frames sent to the detector (0 = full resolution)
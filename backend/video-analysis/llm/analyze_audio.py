@@ -4,15 +4,53 @@ from openai import OpenAI
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, AUDIO_SAMPLE_RATE, PRESCORE_ENABLED
+from llm.transcription import transcribe_audio
+from llm.prescore import prescore_transcript
+from pipeline.metrics import timed
 
-def analyze_audio_content(audio_path: str) -> dict:
+def analyze_audio_content(audio, sample_rate: int = AUDIO_SAMPLE_RATE, timer=None, duration: float = None,
+                          prosody: dict = None) -> dict:
     """
     Transcribes audio and analyzes it using LLM.
+    `audio` is either a path to an audio file or an in-memory mono int16 PCM
+    buffer (numpy array) sampled at `sample_rate`.
+    `timer` (a StageTimer) records the transcribe and score stages when given.
+    Clear-cut transcripts (empty, greeting-only, too short) are scored locally without
+    the LLM call; `duration` (clip seconds) is used for the words-per-minute metric.
+    `prosody` (see audio.prosody) is given to the prompt for the communication score
+    and returned with the result.
+    Placeholder scores (no API key, failed LLM call) come back with scored_by "fallback"
+    and a fallback_reason, and are never cached. A transcription outage raises
+    TranscriptionError, so it surfaces as the result's error instead of a "no speech" score.
     """
+    # 1. Transcribe
+    with timed(timer, "transcribe"):
+        transcript_text = transcribe_audio(audio, sample_rate)
+
+    if duration is None and not isinstance(audio, str):
+        duration = len(audio) / float(sample_rate)
+
+    speech_metrics = None
+    if PRESCORE_ENABLED:
+        speech_metrics, verdict = prescore_transcript(transcript_text, duration)
+        if verdict is not None:
+            print(f"Pre-score: {verdict['reason']}, skipping LLM analysis.")
+            return {
+                "transcript": transcript_text,
+                "audio_score": verdict["audio_score"],
+                "final_score": verdict["final_score"],
+                "scored_by": "prescore",
+                "prescore_reason": verdict["reason"],
+                "speech_metrics": speech_metrics,
+                "prosody": prosody,
+            }
+
+    # Transcription and pre-scoring above run offline; only the LLM call needs the key
     if not OPENAI_API_KEY:
-        print("Warning: No OPENAI_API_KEY found. Returning mock analysis.")
-        return {"audio_score": 0, "final_score": 0}
+        print("Warning: No OPENAI_API_KEY found. Skipping LLM scoring.")
+        return {"transcript": transcript_text, "audio_score": 0, "final_score": 0, "scored_by": "fallback",
+                "fallback_reason": "no_api_key", "speech_metrics": speech_metrics, "prosody": prosody}
 
     # Setup clients
     is_openrouter = OPENAI_API_KEY.startswith("sk-or-v1")
@@ -28,48 +66,22 @@ def analyze_audio_content(audio_path: str) -> dict:
         llm_client = OpenAI(api_key=OPENAI_API_KEY)
         llm_model = "gpt-4o"
 
-    # 1. Transcribe
-    transcript_text = ""
-    
-    # Try OpenAI Whisper if NOT OpenRouter (or if we had a separate key, but here we assume one key)
-    if not is_openrouter:
-        try:
-            with open(audio_path, "rb") as audio_file:
-                transcript_response = llm_client.audio.transcriptions.create(
-                    model="whisper-1", 
-                    file=audio_file
-                )
-            transcript_text = transcript_response.text
-        except Exception as e:
-            print(f"OpenAI Transcription failed: {e}")
-
-    # Fallback to SpeechRecognition (Google Web Speech API) if OpenAI skipped or failed
-    if not transcript_text:
-        try:
-            import speech_recognition as sr
-            r = sr.Recognizer()
-            with sr.AudioFile(audio_path) as source:
-                audio_data = r.record(source)
-                transcript_text = r.recognize_google(audio_data)
-                print(f"DEBUG: Transcription successful via Google Web Speech: {transcript_text[:50]}...")
-        except ImportError:
-            print("SpeechRecognition not installed. Install with: pip install SpeechRecognition")
-        except Exception as e:
-            print(f"Fallback Transcription failed: {e}")
-
-    if not transcript_text:
-        print("Warning: Could not transcribe audio. Using mock text for testing.")
-        transcript_text = "I am very interested in this position because I have the required skills."
-
     # 2. Analyze with LLM
+    delivery = ""
+    if prosody:
+        delivery = f"""
+    Delivery metrics measured from the audio (speech ratio, pauses, syllables per second, loudness in dBFS):
+    {json.dumps(prosody)}
+    """
+
     prompt = f"""
     You are a strict professional Interview Evaluator.
     Analyze the following candidate response from a video interview.
     
     Transcript: "{transcript_text}"
-    
+    {delivery}
     Evaluation Criteria:
-    1. Communication Quality ('audio_score'): Clarity, fluency, professional tone.
+    1. Communication Quality ('audio_score'): Clarity, fluency, professional tone, and (when delivery metrics are given) pacing, pauses and steady volume.
     2. Content Relevancy ('final_score'): Depth of answer, relevance to interview context, completeness.
     
     STRICT SCORING RULES:
@@ -86,25 +98,33 @@ def analyze_audio_content(audio_path: str) -> dict:
     """
 
     try:
-        response = llm_client.chat.completions.create(
-            model=llm_model,
-            messages=[
-                {"role": "system", "content": "You are a critical interview evaluator. Output strict JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
+        with timed(timer, "score"):
+            response = llm_client.chat.completions.create(
+                model=llm_model,
+                messages=[
+                    {"role": "system", "content": "You are a critical interview evaluator. Output strict JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
         content = response.choices[0].message.content
         result = json.loads(content)
         return {
             "transcript": transcript_text,
             "audio_score": result.get("audio_score", 0),
-            "final_score": result.get("final_score", 0)
+            "final_score": result.get("final_score", 0),
+            "scored_by": "llm",
+            "speech_metrics": speech_metrics,
+            "prosody": prosody,
         }
     except Exception as e:
         print(f"LLM analysis failed: {e}")
         return {
-            "transcript": transcript_text or "Analysis Failed",
+            "transcript": transcript_text,
             "audio_score": 0, 
-            "final_score": 0
+            "final_score": 0,
+            "scored_by": "fallback",
+            "fallback_reason": "llm_error",
+            "speech_metrics": speech_metrics,
+            "prosody": prosody,
         }
@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PRESCORE_MIN_WORDS, PRESCORE_MAX_FILLER_RATIO
+
+# Words that carry no content on their own. Multi-word fillers are matched as phrases.
+# Words that are often real content ("like", "so", "well", "actually", "okay") are left out.
+FILLER_WORDS = {"um", "uh", "umm", "uhh", "er", "erm", "ah", "hmm", "mm", "basically"}
+FILLER_PHRASES = ("you know", "i mean", "kind of", "sort of")
+
+# Words allowed in a greeting/self-introduction that says nothing else
+GREETING_WORDS = {
+    "hi", "hello", "hey", "good", "morning", "afternoon", "evening", "my", "name", "is", "i", "am", "i'm",
+    "this", "thank", "thanks", "you", "everyone", "there", "and", "nice", "to", "meet", "it's", "yes", "so",
+}
+
+# At least one of these must appear for an answer to count as a bare greeting
+GREETING_MARKERS = {"hi", "hello", "hey", "morning", "afternoon", "evening", "name", "thank", "thanks"}
+
+# Deterministic scores for the clear-cut cases, in line with the LLM prompt's rules
+NO_SPEECH_SCORE = 0
+GREETING_ONLY_SCORE = 1
+TOO_SHORT_SCORE = 2
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+def transcript_metrics(transcript: str, duration: float = None) -> dict:
+    """
+    Cheap text statistics for a transcript: word counts, filler-word ratio,
+    greeting-only flag and words per minute (when the clip duration is known).
+    """
+    text = (transcript or "").lower()
+    words = _WORD_RE.findall(text)
+    word_count = len(words)
+
+    filler_count = sum(1 for word in words if word in FILLER_WORDS)
+    filler_count += sum(len(re.findall(r"\b" + phrase + r"\b", text)) * 2 for phrase in FILLER_PHRASES)
+    filler_count = min(filler_count, word_count)
+
+    words_per_minute = None
+    if duration:
+        words_per_minute = round(word_count * 60.0 / duration, 1)
+
+    # Names are the only words allowed outside the greeting vocabulary, so a short
+    # answer made of greeting words plus at most two others counts as a bare introduction
+    non_greeting = [word for word in words if word not in GREETING_WORDS]
+    greeting_only = (
+        0 < word_count < PRESCORE_MIN_WORDS
+        and len(non_greeting) <= 2
+        and not GREETING_MARKERS.isdisjoint(words)
+    )
+
+    return {
+        "word_count": word_count,
+        "content_word_count": word_count - filler_count,
+        "filler_ratio": round(filler_count / word_count, 3) if word_count else 0.0,
+        "words_per_minute": words_per_minute,
+        "greeting_only": greeting_only,
+    }
+
+def prescore_transcript(transcript: str, duration: float = None):
+    """
+    Returns (metrics, verdict). `verdict` is None when the transcript needs the LLM,
+    otherwise a dict with audio_score/final_score and the rule that decided it.
+    """
+    metrics = transcript_metrics(transcript, duration)
+
+    reason = None
+    score = None
+    if metrics["word_count"] == 0:
+        reason, score = "no_speech", NO_SPEECH_SCORE
+    elif metrics["greeting_only"]:
+        reason, score = "greeting_only", GREETING_ONLY_SCORE
+    elif metrics["word_count"] < PRESCORE_MIN_WORDS:
+        reason, score = "too_short", TOO_SHORT_SCORE
+    elif metrics["filler_ratio"] > PRESCORE_MAX_FILLER_RATIO:
+        reason, score = "mostly_filler", TOO_SHORT_SCORE
+
+    if reason is None:
+        return metrics, None
+    return metrics, {"audio_score": score, "final_score": score, "reason": reason}
@@ -0,0 +1,218 @@
+import os
+import sys
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    OPENAI_API_KEY, AUDIO_SAMPLE_RATE, TRANSCRIPTION_BACKEND, TRANSCRIPTION_PARALLELISM,
+    VAD_MAX_CHUNK_SECONDS, LOCAL_ASR_MODEL, LOCAL_ASR_COMPUTE_TYPE, LOCAL_ASR_THREADS,
+    STUB_TRANSCRIPT,
+)
+from audio.extract_audio import pcm_to_wav_bytes
+from audio.vad import segment_speech
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionError(Exception):
+    """Raised when no transcription service could process the audio (as opposed to silence)."""
+
+def _is_path(audio) -> bool:
+    return isinstance(audio, (str, os.PathLike))
+
+class TranscriptionBackend:
+    """
+    Turns one clip into text. `audio` is a file path or mono int16 PCM at `sample_rate`.
+    Implementations return "" when the clip has no recognizable speech, raise
+    TranscriptionError when they could not transcribe it, and must be safe to call
+    from several threads (chunks of a long answer are transcribed concurrently).
+    """
+
+    name = "base"
+
+    def warmup(self):
+        """Loads whatever the backend needs up front. Called once per process at startup."""
+
+    def transcribe(self, audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> str:
+        raise NotImplementedError
+
+class RemoteBackend(TranscriptionBackend):
+    """
+    OpenAI Whisper (when the key is a plain OpenAI key), falling back to Google Web Speech.
+    """
+
+    name = "remote"
+
+    def __init__(self):
+        self.is_openrouter = bool(OPENAI_API_KEY) and OPENAI_API_KEY.startswith("sk-or-v1")
+        self.client = None
+        if OPENAI_API_KEY and not self.is_openrouter:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=OPENAI_API_KEY)
+
+    def transcribe(self, audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> str:
+        transcript_text = ""
+        # Whether some service actually processed the audio; "" from one of them means silence
+        answered = False
+        failures = []
+
+        # Try OpenAI Whisper if NOT OpenRouter (or if we had a separate key, but here we assume one key)
+        if self.client is not None:
+            try:
+                if _is_path(audio):
+                    with open(audio, "rb") as audio_file:
+                        transcript_response = self.client.audio.transcriptions.create(
+                            model="whisper-1",
+                            file=audio_file
+                        )
+                else:
+                    transcript_response = self.client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=("audio.wav", pcm_to_wav_bytes(audio, sample_rate))
+                    )
+                transcript_text = transcript_response.text
+                answered = True
+            except Exception as e:
+                print(f"OpenAI Transcription failed: {e}")
+                failures.append(f"OpenAI: {e}")
+
+        # Fallback to SpeechRecognition (Google Web Speech API) if OpenAI skipped or failed
+        if not transcript_text:
+            try:
+                import speech_recognition as sr
+                r = sr.Recognizer()
+                if _is_path(audio):
+                    with sr.AudioFile(audio) as source:
+                        audio_data = r.record(source)
+                else:
+                    audio_data = sr.AudioData(audio.tobytes(), sample_rate, 2)
+                try:
+                    transcript_text = r.recognize_google(audio_data)
+                    print(f"DEBUG: Transcription successful via Google Web Speech: {transcript_text[:50]}...")
+                except sr.UnknownValueError:
+                    transcript_text = ""  # Reached the service, no speech recognized
+                answered = True
+            except ImportError:
+                print("SpeechRecognition not installed. Install with: pip install SpeechRecognition")
+                failures.append("SpeechRecognition not installed")
+            except Exception as e:
+                print(f"Fallback Transcription failed: {e}")
+                failures.append(f"Google Web Speech: {e}")
+
+        if not answered:
+            raise TranscriptionError(f"Transcription failed ({'; '.join(failures)})")
+        return transcript_text
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Offline CPU transcription with faster-whisper (CTranslate2, int8 by default).
+    The model is loaded once per process; no network round trip per clip.
+    """
+
+    name = "local"
+
+    def __init__(self, model_name: str = LOCAL_ASR_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def warmup(self):
+        self._get_model()
+
+    def _get_model(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError("faster-whisper not installed. Install with: pip install faster-whisper")
+
+                logger.info(f"Loading local ASR model: {self.model_name} ({LOCAL_ASR_COMPUTE_TYPE})")
+                self._model = WhisperModel(
+                    self.model_name,
+                    device="cpu",
+                    compute_type=LOCAL_ASR_COMPUTE_TYPE,
+                    cpu_threads=LOCAL_ASR_THREADS,
+                    # Lets chunks of one answer run through the model concurrently
+                    num_workers=TRANSCRIPTION_PARALLELISM,
+                )
+        return self._model
+
+    def transcribe(self, audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> str:
+        model = self._get_model()
+        if not _is_path(audio):
+            if sample_rate != 16000:
+                raise ValueError(f"Local ASR expects 16 kHz audio, got {sample_rate} Hz.")
+            audio = audio.astype(np.float32) / 32768.0
+
+        try:
+            segments, _info = model.transcribe(audio, beam_size=1)
+            return " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            print(f"Local Transcription failed: {e}")
+            raise TranscriptionError(f"Transcription failed (local ASR: {e})")
+
+class StubBackend(TranscriptionBackend):
+    """
+    Deterministic backend for tests and benchmarks: no model, no network.
+    """
+
+    name = "stub"
+
+    def __init__(self, text: str = STUB_TRANSCRIPT):
+        self.text = text
+
+    def transcribe(self, audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> str:
+        return self.text
+
+BACKENDS = {
+    RemoteBackend.name: RemoteBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+    StubBackend.name: StubBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(name: str = None) -> TranscriptionBackend:
+    """
+    Returns the process-wide instance of the named backend (TRANSCRIPTION_BACKEND by default).
+    """
+    name = name or TRANSCRIPTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name}. Allowed: {list(BACKENDS)}")
+
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+def transcribe_audio(audio, sample_rate: int = AUDIO_SAMPLE_RATE, backend: TranscriptionBackend = None) -> str:
+    """
+    Transcribes a clip. In-memory buffers longer than VAD_MAX_CHUNK_SECONDS are split
+    at silences and the chunks are transcribed concurrently (TRANSCRIPTION_PARALLELISM
+    at a time), then stitched back in order, so latency does not grow linearly with length.
+    If the VAD finds no speech at all, the buffer is cut at fixed VAD_MAX_CHUNK_SECONDS steps instead.
+    """
+    backend = backend or get_backend()
+
+    if _is_path(audio) or len(audio) <= VAD_MAX_CHUNK_SECONDS * sample_rate:
+        return backend.transcribe(audio, sample_rate)
+
+    segments = segment_speech(audio, sample_rate)
+    if not segments:
+        # The energy VAD heard nothing (very quiet or noisy recording); let the ASR decide
+        # on plain fixed-length cuts rather than dropping the whole clip
+        step = int(VAD_MAX_CHUNK_SECONDS * sample_rate)
+        segments = [(start, min(start + step, len(audio))) for start in range(0, len(audio), step)]
+
+    chunks = [audio[start:end] for start, end in segments]
+    with ThreadPoolExecutor(max_workers=min(TRANSCRIPTION_PARALLELISM, len(chunks))) as executor:
+        texts = list(executor.map(lambda chunk: backend.transcribe(chunk, sample_rate), chunks))
+
+    return " ".join(text.strip() for text in texts if text and text.strip())
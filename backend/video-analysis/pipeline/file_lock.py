@@ -0,0 +1,53 @@
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Fallback lock files older than this are assumed left behind by a crashed process
+STALE_LOCK_SECONDS = 600
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True, poll_interval: float = 0.05):
+    """
+    Exclusive lock shared by every process on this host, held on the file at `path`.
+    Uses flock(2) where available, otherwise an O_EXCL lock file.
+    With `blocking=False`, raises BlockingIOError instead of waiting for another holder.
+    """
+    if fcntl is not None:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+        return
+
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > STALE_LOCK_SECONDS:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            if not blocking:
+                raise BlockingIOError(f"Lock is held: {path}")
+            time.sleep(poll_interval)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
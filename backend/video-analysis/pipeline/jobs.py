@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent dir to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import JOB_WORKERS, MAX_PENDING_JOBS, JOB_RESULT_TTL
+from pipeline.metrics import record_observations
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at MAX_PENDING_JOBS."""
+
+def _init_worker():
+    """
+    Runs once in every worker process: load and warm the detector and the
+    transcription backend before taking jobs.
+    """
+    from video.model_registry import load_model
+    from llm.transcription import get_backend
+    load_model()
+    get_backend().warmup()
+
+def _warmup_task() -> bool:
+    return True
+
+def _run_job(video_path: str, content_hash: str = None) -> dict:
+    """
+    Runs in a worker process. Metrics observations travel back with the result
+    so the API process (which serves /metrics) can record them.
+    """
+    from pipeline.process_video import process_video_pipeline
+    from pipeline.metrics import StageTimer
+    timer = StageTimer()
+    result = process_video_pipeline(video_path, content_hash=content_hash, timer=timer)
+    return {"result": result, "observations": timer.observations}
+
+def _run_batch_job(items: list, progress=None, keys: list = None) -> dict:
+    """
+    Worker-side entry point for one group of the batch endpoint (see process_video_batch).
+    When `progress` (a queue from JobManager.progress_queue) is given, (keys[i], result)
+    is put on it as each video finishes, ahead of the group's combined result.
+    """
+    from pipeline.process_video import process_video_batch
+    from pipeline.metrics import StageTimer
+    timer = StageTimer()
+    on_result = None
+    if progress is not None:
+        keys = keys if keys is not None else list(range(len(items)))
+        on_result = lambda index, result: progress.put((keys[index], result))
+    results = process_video_batch(items, timer=timer, on_result=on_result)
+    return {"result": results, "observations": timer.observations}
+
+class JobManager:
+    """
+    Runs process_video_pipeline on a bounded pool of worker processes, each with a warm model.
+    Every analysis goes through it, synchronous requests included.
+    Jobs are tracked in memory; finished jobs are dropped JOB_RESULT_TTL seconds after completion.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, max_pending: int = MAX_PENDING_JOBS,
+                 result_ttl: int = JOB_RESULT_TTL):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+
+        self._executor = None
+        self._sync_manager = None
+        self._warmup = []
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the worker processes and warms each of them.
+        'spawn' is used so workers never inherit a forked copy of the parent's torch/OpenMP state.
+        """
+        if self._executor is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+        )
+        # Serves the queues that carry per-video batch progress out of the workers
+        self._sync_manager = context.Manager()
+        # Submitting one task per worker forces every process to start (and warm up) now
+        self._warmup = [self._executor.submit(_warmup_task) for _ in range(self.max_workers)]
+        logger.info(f"Job pool started with {self.max_workers} workers.")
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        if self._sync_manager is not None:
+            self._sync_manager.shutdown()
+            self._sync_manager = None
+
+        # Cancelled jobs never reached the pipeline, so their uploads are still on disk
+        with self._lock:
+            for job in self._jobs.values():
+                if job["future"].cancelled():
+                    for video_path in job["video_paths"]:
+                        if os.path.exists(video_path):
+                            os.remove(video_path)
+
+    def is_ready(self) -> bool:
+        """
+        True once every worker process has finished warming up.
+        """
+        return bool(self._warmup) and all(f.done() and f.exception() is None for f in self._warmup)
+
+    def queue_depth(self) -> int:
+        """
+        Number of submitted jobs that have not finished yet (queued or running).
+        """
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job["future"].done())
+
+    def has_capacity(self) -> bool:
+        return self.queue_depth() < self.max_pending
+
+    def submit(self, video_path: str, content_hash: str = None) -> str:
+        """
+        Queues a saved video for processing and returns its job id.
+        Raises QueueFullError when MAX_PENDING_JOBS jobs are already waiting.
+        """
+        job_id, _ = self._submit(_run_job, (video_path, content_hash), [video_path])
+        logger.info(f"Queued job {job_id} for {video_path}")
+        return job_id
+
+    def progress_queue(self):
+        """
+        A queue that worker processes can put on, for submit_batch(progress=...).
+        """
+        if self._sync_manager is None:
+            raise RuntimeError("Job pool is not running.")
+        return self._sync_manager.Queue()
+
+    def submit_for_result(self, video_path: str, content_hash: str = None):
+        """
+        Like submit(), for callers that wait for the result themselves: returns the job's
+        future, whose result is {"result": ..., "observations": [...]}.
+        """
+        job_id, future = self._submit(_run_job, (video_path, content_hash), [video_path])
+        logger.info(f"Queued job {job_id} for {video_path} (waited on by the request)")
+        return future
+
+    def submit_batch(self, items: list, progress=None, keys: list = None):
+        """
+        Queues a group of videos (process_video_batch items) as a single job and returns its future,
+        whose result is {"result": [one result per item], "observations": [...]}.
+        With `progress` (see progress_queue), (keys[i], result) also arrives there per video
+        as soon as it finishes. `keys` defaults to the item positions.
+        The group counts as one pending job. Raises QueueFullError like submit().
+        """
+        cleanup_paths = [item["video_path"] for item in items if item.get("delete_video", True)]
+        job_id, future = self._submit(_run_batch_job, (items, progress, keys), cleanup_paths)
+        logger.info(f"Queued batch job {job_id} with {len(items)} videos")
+        return future
+
+    def _submit(self, fn, args: tuple, cleanup_paths: list):
+        if self._executor is None:
+            raise RuntimeError("Job pool is not running.")
+
+        self._purge_expired()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job["future"].done())
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending}/{self.max_pending}).")
+
+            job_id = str(uuid.uuid4())
+            job = {
+                "video_paths": cleanup_paths,
+                "submitted_at": time.time(),
+                "finished_at": None,
+            }
+            job["future"] = self._executor.submit(fn, *args)
+            self._jobs[job_id] = job
+
+        def _mark_finished(future):
+            job["finished_at"] = time.time()
+            if not future.cancelled() and future.exception() is None:
+                record_observations(future.result()["observations"])
+
+        job["future"].add_done_callback(_mark_finished)
+        return job_id, job["future"]
+
+    def get(self, job_id: str):
+        """
+        Returns the public status of a job, or None if unknown or expired.
+        """
+        self._purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        future = job["future"]
+        status = {
+            "job_id": job_id,
+            "status": "queued",
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+            "result": None,
+            "error": None,
+        }
+        if future.cancelled():
+            status["status"] = "cancelled"
+        elif future.done():
+            error = future.exception()
+            if error is None:
+                status["status"] = "done"
+                status["result"] = future.result()["result"]
+            else:
+                status["status"] = "failed"
+                status["error"] = str(error)
+        elif future.running():
+            status["status"] = "running"
+        return status
+
+    def _purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,131 @@
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+# Minimal Prometheus-style metrics (text exposition format 0.0.4), kept in-process.
+# Job workers run in other processes, so they hand their observations back with the
+# result and the API process records them (see pipeline/jobs.py).
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+FRAME_BUCKETS = (0, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+def _format_labels(labels: dict, extra: dict = None) -> str:
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels, {'le': '+Inf'})} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series['count']}")
+        return lines
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+STAGE_SECONDS = Histogram(
+    "video_pipeline_stage_seconds", "Wall time per pipeline stage.", STAGE_BUCKETS, labelnames=("stage",)
+)
+FRAMES = Histogram(
+    "video_detection_frames", "Frames per video by kind (decoded, skipped, inferred).", FRAME_BUCKETS, labelnames=("kind",)
+)
+FRAME_RING_STALL = Histogram(
+    "video_frame_ring_stall_seconds",
+    "Per video, time the decoder waited for a free ring slot (side=decoder) or inference waited for frames (side=inference).",
+    STAGE_BUCKETS, labelnames=("side",)
+)
+FRAME_RING_DEPTH = Histogram(
+    "video_frame_ring_max_depth", "Per video, most decoded frames waiting in the ring.", (0, 1, 2, 4, 8, 16, 32, 64)
+)
+JOB_QUEUE_DEPTH = Gauge("video_job_queue_depth", "Queued or running analysis jobs.")
+
+_METRICS = (STAGE_SECONDS, FRAMES, FRAME_RING_STALL, FRAME_RING_DEPTH, JOB_QUEUE_DEPTH)
+_HISTOGRAMS = {metric.name: metric for metric in _METRICS if isinstance(metric, Histogram)}
+
+class StageTimer:
+    """
+    Collects the observations of one pipeline run. Safe to share between the run's branch threads.
+    Call record() to push them into this process's metrics, or ship `observations` to the process that should.
+    """
+
+    def __init__(self):
+        self.observations = []
+        self._lock = threading.Lock()
+
+    def add(self, metric: Histogram, value: float, **labels):
+        with self._lock:
+            self.observations.append((metric.name, value, labels))
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(STAGE_SECONDS, time.perf_counter() - start, stage=name)
+
+    def stages(self) -> dict:
+        """Stage name -> seconds, for logging."""
+        with self._lock:
+            return {
+                labels["stage"]: round(value, 4)
+                for name, value, labels in self.observations if name == STAGE_SECONDS.name
+            }
+
+    def record(self):
+        record_observations(self.observations)
+
+def timed(timer, stage: str):
+    """
+    timer.stage(stage) when a StageTimer is given, otherwise a no-op context.
+    """
+    return timer.stage(stage) if timer is not None else nullcontext()
+
+def record_observations(observations):
+    for name, value, labels in observations:
+        metric = _HISTOGRAMS.get(name)
+        if metric is not None:
+            metric.observe(value, **labels)
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -2,27 +2,63 @@ import os
 import uuid
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add parent dir to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import TEMP_AUDIO_DIR
+from config import TEMP_AUDIO_DIR, AUDIO_EXTRACTION_MODE, BATCH_AUDIO_PARALLELISM, PROSODY_ENABLED
+from video.media_context import MediaContext
 from video.validate_video import validate_video
-from video.id_card_yolo import detect_id_card
-from audio.extract_audio import extract_audio
+from video.id_card_yolo import detect_id_card, detect_id_cards
+from video.model_registry import get_model
+from audio.extract_audio import extract_audio, extract_audio_pcm
+from audio.prosody import prosody_features
 from llm.analyze_audio import analyze_audio_content
+from pipeline.result_cache import get_result_cache
+from pipeline.metrics import StageTimer, FRAMES, FRAME_RING_STALL, FRAME_RING_DEPTH
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_video_pipeline(video_path: str) -> dict:
+def _detection_branch(media, timer: StageTimer) -> dict:
     """
-    Orchestrates the full video analysis pipeline.
+    CPU-bound branch: ID card detection over sampled frames.
     """
-    audio_path = None
-    
-    result = {
+    with timer.stage("detect"):
+        yolo_result = detect_id_card(media, model=get_model())
+    _record_frames(timer, yolo_result)
+    logger.info(f"YOLO ID Check: {yolo_result}")
+    return yolo_result
+
+def _audio_branch(media, audio_path: str, timer: StageTimer) -> dict:
+    """
+    I/O-bound branch: audio extraction, prosody features, then transcription and LLM scoring.
+    With audio_path=None the audio is decoded into an in-memory 16 kHz mono buffer instead of a file.
+    """
+    with timer.stage("extract"):
+        if audio_path is None:
+            audio = extract_audio_pcm(media)
+        else:
+            audio = extract_audio(media, audio_path)
+    if audio_path is None:
+        logger.info(f"Audio extracted to memory: {len(audio)} samples")
+    else:
+        logger.info(f"Audio extracted to: {audio_path}")
+
+    prosody = None
+    if PROSODY_ENABLED:
+        with timer.stage("prosody"):
+            prosody = prosody_features(audio)
+        logger.info(f"Prosody features: {prosody}")
+
+    analysis_result = analyze_audio_content(audio, timer=timer, duration=media.duration, prosody=prosody)
+    logger.info(f"LLM Analysis: {analysis_result}")
+    return analysis_result
+
+def _new_result() -> dict:
+    return {
         "video_valid": False,
         "id_card_present": False,
         "id_card_confidence": 0.0,
@@ -31,37 +67,128 @@ def process_video_pipeline(video_path: str) -> dict:
         "error": None
     }
 
+def _new_audio_path():
+    """
+    A unique temp filename for audio in "file" mode (known up front so cleanup can find it), else None.
+    """
+    if AUDIO_EXTRACTION_MODE == "file":
+        audio_filename = f"{uuid.uuid4()}.wav"
+        return os.path.join(TEMP_AUDIO_DIR, audio_filename)
+    return None
+
+def _apply_analysis(result: dict, analysis_result: dict):
+    result["audio_score"] = analysis_result["audio_score"]
+    result["final_score"] = analysis_result["final_score"]
+    result["transcript"] = analysis_result.get("transcript", "")
+    # Local transcript metrics, and whether the LLM, the pre-scorer or a fallback produced the scores
+    for key in ("speech_metrics", "prosody", "scored_by", "prescore_reason", "fallback_reason"):
+        if key in analysis_result:
+            result[key] = analysis_result[key]
+
+def _cacheable(result: dict) -> bool:
+    """
+    Only genuine scores are cached: LLM scores, or a pre-score of a non-empty transcript
+    (an empty one may be a transient transcription failure). Fallback scores are retried.
+    """
+    scored_by = result.get("scored_by")
+    return scored_by == "llm" or (scored_by == "prescore" and bool(result.get("transcript")))
+
+def _record_frames(timer: StageTimer, yolo_result: dict):
+    timer.add(FRAMES, yolo_result["frames_decoded"], kind="decoded")
+    timer.add(FRAMES, yolo_result["frames_skipped"], kind="skipped")
+    timer.add(FRAMES, yolo_result["frames_inferred"], kind="inferred")
+
+    ring = yolo_result.get("pipeline")
+    if ring is not None:
+        timer.add(FRAME_RING_STALL, ring["decoder_stall_seconds"], side="decoder")
+        timer.add(FRAME_RING_STALL, ring["inference_stall_seconds"], side="inference")
+        timer.add(FRAME_RING_DEPTH, ring["max_queue_depth"])
+
+def _cleanup(video_path: str, audio_path: str, delete_video: bool = True):
+    """
+    Statelessness guarantee: remove the media once it has been processed.
+    """
+    # Delete video
+    if delete_video and os.path.exists(video_path):
+        try:
+            os.remove(video_path)
+            logger.info(f"Deleted temp video: {video_path}")
+        except Exception as e:
+            logger.error(f"Failed to delete video {video_path}: {e}")
+
+    # Delete audio
+    if audio_path and os.path.exists(audio_path):
+        try:
+            os.remove(audio_path)
+            logger.info(f"Deleted temp audio: {audio_path}")
+        except Exception as e:
+            logger.error(f"Failed to delete audio {audio_path}: {e}")
+
+def process_video_pipeline(video_path: str, content_hash: str = None, timer: StageTimer = None) -> dict:
+    """
+    Orchestrates the full video analysis pipeline.
+    After validation, ID card detection and the audio/LLM branch run in parallel,
+    so latency is roughly the slower of the two rather than their sum.
+    When the upload's `content_hash` is known, a previously computed result for the
+    same video is returned from the result cache (the video is still deleted).
+    Stage timings and frame counts are recorded into this process's metrics, unless
+    the caller passes its own `timer` to collect them (e.g. to ship them from a worker process).
+    """
+    owns_timer = timer is None
+    if owns_timer:
+        timer = StageTimer()
+    audio_path = None
+    result = _new_result()
+
+    cache = get_result_cache() if content_hash else None
+
     try:
         logger.info(f"Starting pipeline for: {video_path}")
 
+        if cache is not None:
+            cached = cache.get(content_hash)
+            if cached is not None:
+                logger.info(f"Result cache hit for {content_hash[:12]}")
+                cached["cached"] = True
+                return cached
+
         # 1. Validation
-        if not os.path.exists(video_path):
-            raise FileNotFoundError("Video file not found.")
-            
-        validate_video(video_path)
+        # Probe the container once; every stage below reuses this context
+        with timer.stage("validate"):
+            media = MediaContext.probe(video_path)
+            validate_video(media)
         result["video_valid"] = True
-        logger.info("Video validation passed.")
+        logger.info(f"Video validation passed: {media.to_dict()}")
 
-        # 2. ID Card Detection
-        yolo_result = detect_id_card(video_path)
-        result["id_card_present"] = yolo_result["id_card_present"]
-        result["id_card_confidence"] = yolo_result["id_card_confidence"]
-        logger.info(f"YOLO ID Check: {yolo_result}")
+        audio_path = _new_audio_path()
 
-        # 3. Audio Extraction
-        # Generate a unique temp filename for audio
-        audio_filename = f"{uuid.uuid4()}.wav"
-        audio_path = os.path.join(TEMP_AUDIO_DIR, audio_filename)
-        
-        extract_audio(video_path, audio_path)
-        logger.info(f"Audio extracted to: {audio_path}")
-        
-        # 4. LLM Analysis
-        analysis_result = analyze_audio_content(audio_path)
-        result["audio_score"] = analysis_result["audio_score"]
-        result["final_score"] = analysis_result["final_score"]
-        result["transcript"] = analysis_result.get("transcript", "")
-        logger.info(f"LLM Analysis: {analysis_result}")
+        # 2. ID Card Detection || 3-4. Audio Extraction + LLM Analysis
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+            detection_future = executor.submit(_detection_branch, media, timer)
+            audio_future = executor.submit(_audio_branch, media, audio_path, timer)
+
+            # exception() blocks until each branch finishes, so cleanup never races a running stage
+            detection_error = detection_future.exception()
+            audio_error = audio_future.exception()
+
+        if detection_error is None:
+            yolo_result = detection_future.result()
+            result["id_card_present"] = yolo_result["id_card_present"]
+            result["id_card_confidence"] = yolo_result["id_card_confidence"]
+
+        if audio_error is None:
+            _apply_analysis(result, audio_future.result())
+
+        # Report the first failing stage, in pipeline order
+        branch_error = detection_error or audio_error
+        if branch_error is not None:
+            raise branch_error
+
+        if cache is not None and _cacheable(result):
+            try:
+                cache.put(content_hash, result)
+            except Exception as e:
+                logger.error(f"Failed to store result in cache: {e}")
 
     except Exception as e:
         logger.error(f"Pipeline error: {e}")
@@ -69,20 +196,120 @@ def process_video_pipeline(video_path: str) -> dict:
     
     finally:
         # 5. Cleanup (Statelessness Guarantee)
-        # Delete video
-        if os.path.exists(video_path):
-            try:
-                os.remove(video_path)
-                logger.info(f"Deleted temp video: {video_path}")
-            except Exception as e:
-                logger.error(f"Failed to delete video {video_path}: {e}")
-        
-        # Delete audio
-        if audio_path and os.path.exists(audio_path):
+        _cleanup(video_path, audio_path)
+
+        logger.info(f"Stage timings (s): {timer.stages()}")
+        if owns_timer:
+            timer.record()
+
+    return result
+
+def process_video_batch(items: list, timer: StageTimer = None, on_result=None) -> list:
+    """
+    Runs the pipeline over several videos in one go (used by the batch endpoint, one call per group).
+    `items` are dicts with "video_path" and optional "content_hash" and "delete_video" (default True;
+    False for server-local files that are not ours to delete).
+
+    Detection for all valid videos runs as one detect_id_cards call, so sampled frames from
+    different videos share detector batches; the audio/LLM branches run alongside it,
+    BATCH_AUDIO_PARALLELISM at a time. Failures are isolated per video.
+    `on_result(index, result)` is called as soon as each video's result is final: cache hits
+    and invalid videos right away, the rest as their audio branch finishes once the shared
+    detection is done.
+    Returns one result dict per item, in order.
+    """
+    owns_timer = timer is None
+    if owns_timer:
+        timer = StageTimer()
+
+    cache = get_result_cache()
+    results = [_new_result() for _ in items]
+    medias = {}
+    audio_paths = {}
+
+    def _report(index: int):
+        if on_result is not None:
+            on_result(index, results[index])
+
+    try:
+        # 1. Cache lookups and validation, per video
+        for index, item in enumerate(items):
+            content_hash = item.get("content_hash")
+            if cache is not None and content_hash:
+                cached = cache.get(content_hash)
+                if cached is not None:
+                    cached["cached"] = True
+                    results[index] = cached
+                    _report(index)
+                    continue
             try:
-                os.remove(audio_path)
-                logger.info(f"Deleted temp audio: {audio_path}")
+                with timer.stage("validate"):
+                    media = MediaContext.probe(item["video_path"])
+                    validate_video(media)
             except Exception as e:
-                logger.error(f"Failed to delete audio {audio_path}: {e}")
+                results[index]["error"] = str(e)
+                _report(index)
+                continue
+            results[index]["video_valid"] = True
+            medias[index] = media
+            audio_paths[index] = _new_audio_path()
 
-    return result
+        if not medias:
+            return results
+
+        # 2. Shared-batch detection || 3-4. per-video audio branches
+        indices = sorted(medias)
+        with ThreadPoolExecutor(max_workers=BATCH_AUDIO_PARALLELISM + 1, thread_name_prefix="batch") as executor:
+            def _detect_all():
+                # One sample per group, so it gets its own label instead of skewing per-video "detect"
+                with timer.stage("detect_batch"):
+                    return detect_id_cards([medias[i] for i in indices], model=get_model())
+
+            detection_future = executor.submit(_detect_all)
+            audio_futures = {
+                i: executor.submit(_audio_branch, medias[i], audio_paths[i], timer) for i in indices
+            }
+
+            detection_error = detection_future.exception()
+            detections = detection_future.result() if detection_error is None else [None] * len(indices)
+            detections = dict(zip(indices, detections))
+            pending = {audio_futures[i]: i for i in indices}
+
+            # Each video is final once its own audio branch is done
+            for audio_future in as_completed(pending):
+                i = pending[audio_future]
+                yolo_result = detections[i]
+                result = results[i]
+                errors = []
+
+                if detection_error is not None:
+                    errors.append(str(detection_error))
+                elif "error" in yolo_result:
+                    errors.append(yolo_result["error"])
+                else:
+                    result["id_card_present"] = yolo_result["id_card_present"]
+                    result["id_card_confidence"] = yolo_result["id_card_confidence"]
+                    _record_frames(timer, yolo_result)
+
+                audio_error = audio_future.exception()
+                if audio_error is None:
+                    _apply_analysis(result, audio_future.result())
+                else:
+                    errors.append(str(audio_error))
+
+                if errors:
+                    result["error"] = errors[0]
+                elif cache is not None and items[i].get("content_hash") and _cacheable(result):
+                    try:
+                        cache.put(items[i]["content_hash"], result)
+                    except Exception as e:
+                        logger.error(f"Failed to store result in cache: {e}")
+                _report(i)
+
+    finally:
+        for index, item in enumerate(items):
+            _cleanup(item["video_path"], audio_paths.get(index), item.get("delete_video", True))
+        if owns_timer:
+            timer.record()
+
+    return results
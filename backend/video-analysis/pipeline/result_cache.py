@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Add parent dir to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from config import (
+    RESULT_CACHE_ENABLED, RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL, PIPELINE_VERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+# Settings that change what the pipeline returns for the same video.
+# Bumping any of them invalidates earlier cache entries.
+_VERSIONED_SETTINGS = (
+    "YOLO_MODEL_PATH", "ID_CARD_CONFIDENCE_THRESHOLD", "FRAME_SAMPLING_MODE", "FRAME_SAMPLE_RATE",
+    "FRAME_SAMPLE_FPS", "FRAME_SAMPLE_BUDGET", "AUDIO_SAMPLE_RATE", "TRANSCRIPTION_BACKEND",
+    "LOCAL_ASR_MODEL", "MAX_VIDEO_DURATION", "PRESCORE_ENABLED", "PRESCORE_MIN_WORDS", "PRESCORE_MAX_FILLER_RATIO",
+    "PROSODY_ENABLED", "SCENE_CHANGE_GATE", "SCENE_CHANGE_THRESHOLD", "INFERENCE_IMAGE_SIZE",
+    "DETECTOR_BACKEND", "ONNX_MODEL_PATH",
+)
+
+def cache_version() -> str:
+    """
+    PIPELINE_VERSION plus a short digest of the result-affecting settings.
+    """
+    settings = {name: getattr(config, name, None) for name in _VERSIONED_SETTINGS}
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return f"{PIPELINE_VERSION}-{digest}"
+
+class ResultCache:
+    """
+    On-disk (SQLite) LRU cache of pipeline results keyed by video content hash + cache_version().
+    Only derived data (scores, flags, transcript) is stored, never the media itself.
+    Entries expire after `ttl` seconds; the least recently used are evicted beyond `max_entries`.
+    SQLite makes it safe to share between the API process and the job worker processes,
+    and hit/miss counters are kept in the same file so they cover all of them.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 ttl: int = RESULT_CACHE_TTL):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = cache_version()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _key(self, content_hash: str) -> str:
+        return f"{content_hash}:{self.version}"
+
+    def _count(self, conn, name: str):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, content_hash: str):
+        """
+        Returns the cached result dict, or None on a miss (including expired entries).
+        """
+        key = self._key(content_hash)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self._count(conn, "misses")
+                return None
+
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._count(conn, "hits")
+        return json.loads(row[0])
+
+    def put(self, content_hash: str, result: dict):
+        key = self._key(content_hash)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now),
+            )
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "version": self.version,
+        }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """
+    Returns the process-wide ResultCache, or None when RESULT_CACHE_ENABLED is off.
+    """
+    global _cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
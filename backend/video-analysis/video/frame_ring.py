@@ -0,0 +1,127 @@
+import sys
+import os
+import time
+import queue
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Marks the end of the stream (or a producer error) in the filled queue
+_END = object()
+
+class FrameRing:
+    """
+    Bounded ring of preallocated frame slots shared by one decoder (producer) thread and
+    the inference (consumer) thread.
+
+    The producer copies each frame into a free slot and publishes the slot index; the
+    consumer takes up to a batch of slots, runs inference on them in place and hands the
+    slots back. Memory is capped at `capacity` frames, and the producer blocks when the
+    consumer falls behind.
+    Slots are allocated on the first frame, whose shape every later frame of the clip shares.
+
+    Tuning counters:
+    - max_depth / mean_depth: filled slots waiting when the consumer takes a batch
+    - decoder_stall: seconds the decoder waited for a free slot (inference is the bottleneck)
+    - inference_stall: seconds inference waited for frames (decoding is the bottleneck)
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._slots = None
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for index in range(self.capacity):
+            self._free.put(index)
+
+        self._stopped = threading.Event()
+        self.error = None
+
+        self.max_depth = 0
+        self._depth_total = 0
+        self._takes = 0
+        self.decoder_stall = 0.0
+        self.inference_stall = 0.0
+
+    def put(self, frame_number: int, frame: np.ndarray) -> bool:
+        """
+        Producer side: copies `frame` into a free slot. Returns False if the consumer stopped.
+        """
+        start = time.perf_counter()
+        while True:
+            if self._stopped.is_set():
+                return False
+            try:
+                index = self._free.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        self.decoder_stall += time.perf_counter() - start
+
+        if self._slots is None:
+            self._slots = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+        if self._slots.shape[1:] == frame.shape and self._slots.dtype == frame.dtype:
+            np.copyto(self._slots[index], frame)
+            self._filled.put((index, frame_number, None))
+        else:
+            # A frame with an odd shape (corrupt stream, resolution change) travels as its own array
+            self._filled.put((index, frame_number, frame.copy()))
+        return True
+
+    def close(self, error: BaseException = None):
+        """
+        Producer side: no more frames. `error` is re-raised in the consumer.
+        """
+        self.error = error
+        self._filled.put(_END)
+
+    def stop(self):
+        """
+        Consumer side: stop early; a blocked producer returns from put().
+        """
+        self._stopped.set()
+
+    def take(self, batch_size: int):
+        """
+        Consumer side: blocks until `batch_size` frames are ready or the stream ended.
+        Returns (slot_indices, frame_numbers, frames), with empty lists at the end of the stream.
+        Frames are views into the ring and stay valid until release(slot_indices).
+        """
+        depth = self._filled.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._takes += 1
+
+        indices, numbers, frames = [], [], []
+        while len(indices) < batch_size:
+            start = time.perf_counter()
+            item = self._filled.get()
+            self.inference_stall += time.perf_counter() - start
+
+            if item is _END:
+                # Leave the marker for the next take() so it also sees the end
+                self._filled.put(_END)
+                break
+            index, frame_number, frame = item
+            indices.append(index)
+            numbers.append(frame_number)
+            frames.append(self._slots[index] if frame is None else frame)
+
+        if not indices and self.error is not None:
+            raise self.error
+        return indices, numbers, frames
+
+    def release(self, indices: list):
+        for index in indices:
+            self._free.put(index)
+
+    def stats(self) -> dict:
+        return {
+            "ring_size": self.capacity,
+            "max_queue_depth": self.max_depth,
+            "mean_queue_depth": round(self._depth_total / self._takes, 2) if self._takes else 0.0,
+            "decoder_stall_seconds": round(self.decoder_stall, 4),
+            "inference_stall_seconds": round(self.inference_stall, 4),
+        }
@@ -0,0 +1,108 @@
+import cv2
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    FRAME_SAMPLING_MODE, FRAME_SAMPLE_RATE, FRAME_SAMPLE_FPS,
+    FRAME_SAMPLE_BUDGET, FRAME_SEEK_MIN_GAP,
+)
+
+SAMPLING_MODES = ("stride", "fps", "budget")
+
+class FrameSampler:
+    """
+    Yields (frame_number, frame) pairs for the sampled frames of an open cv2.VideoCapture.
+
+    Skipped frames are only grab()-ed (demuxed, never retrieved or color-converted),
+    and long gaps are crossed with a seek, so the cost depends on how many frames
+    are sampled rather than how many the clip contains.
+
+    Modes:
+    - "stride": every FRAME_SAMPLE_RATE-th frame (frame numbers are 1-based, as before).
+    - "fps":    FRAME_SAMPLE_FPS frames per second of video, whatever the source fps.
+    - "budget": exactly FRAME_SAMPLE_BUDGET frames spread evenly across the clip.
+    """
+
+    def __init__(self, cap, mode: str = None, fps: float = None, frame_total: int = None):
+        mode = mode or FRAME_SAMPLING_MODE
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {mode}. Allowed: {SAMPLING_MODES}")
+
+        self.cap = cap
+        self.fps = fps if fps is not None else cap.get(cv2.CAP_PROP_FPS)
+        self.frame_total = frame_total if frame_total is not None else int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.mode = self._resolve_mode(mode)
+
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.seeks = 0
+
+    def _resolve_mode(self, mode: str) -> str:
+        # Containers without reliable metadata (e.g. some webm) report 0 fps / frames
+        if (mode == "fps" and not self.fps) or (mode == "budget" and self.frame_total <= 0):
+            return "stride"
+        return mode
+
+    def _target_frames(self):
+        """Generates the 1-based frame numbers to sample, in increasing order."""
+        if self.mode == "stride":
+            n = FRAME_SAMPLE_RATE
+            while True:
+                yield n
+                n += FRAME_SAMPLE_RATE
+
+        elif self.mode == "fps":
+            step = max(1.0, self.fps / FRAME_SAMPLE_FPS)
+            k = 0
+            while True:
+                yield int(round(k * step)) + 1
+                k += 1
+
+        else:
+            budget = max(1, min(FRAME_SAMPLE_BUDGET, self.frame_total))
+            if budget == 1:
+                yield (self.frame_total + 1) // 2
+                return
+            step = (self.frame_total - 1) / (budget - 1)
+            for k in range(budget):
+                yield int(round(k * step)) + 1
+
+    def _advance_to(self, position: int, target: int) -> int:
+        """
+        Moves the capture so the next grab() returns frame `target`.
+        Returns the new position (number of frames consumed), or -1 at end of stream.
+        """
+        gap = target - 1 - position
+        if gap >= FRAME_SEEK_MIN_GAP:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target - 1)
+            self.seeks += 1
+            return target - 1
+
+        for _ in range(gap):
+            if not self.cap.grab():
+                return -1
+            self.frames_grabbed += 1
+        return target - 1
+
+    def __iter__(self):
+        position = 0  # frames consumed so far
+        for target in self._target_frames():
+            if target <= position:
+                continue
+
+            position = self._advance_to(position, target)
+            if position < 0:
+                return
+
+            if not self.cap.grab():
+                return
+            self.frames_grabbed += 1
+            position += 1
+
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                return
+            self.frames_decoded += 1
+
+            yield target, frame
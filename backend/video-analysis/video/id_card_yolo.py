@@ -1,62 +1,254 @@
-from ultralytics import YOLO
-import cv2
 import sys
 import os
+import logging
+import threading
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import YOLO_MODEL_PATH, ID_CARD_CONFIDENCE_THRESHOLD, FRAME_SAMPLE_RATE
+from config import (
+    ID_CARD_CONFIDENCE_THRESHOLD, DETECTION_BATCH_SIZE, SCENE_CHANGE_GATE, INFERENCE_IMAGE_SIZE,
+    DETECTION_PIPELINING, FRAME_RING_SIZE,
+)
+from video.model_registry import get_model, inference_lock
+from video.frame_sampler import FrameSampler
+from video.media_context import as_media_context
+from video.scene_gate import SceneChangeGate, downscale_for_inference
+from video.frame_ring import FrameRing
 
-def detect_id_card(video_path: str) -> dict:
+logger = logging.getLogger(__name__)
+
+# Classes: 67 (cell phone), 73 (book), 27 (tie - proxy for lanyard)
+TARGET_CLASSES = [67, 73, 27]
+
+def predict(model, frames: list) -> list:
     """
-    Detects ID card presence in a video using YOLO.
+    Runs one detector call and returns, per frame, a list of (class_id, confidence).
+    ONNX detectors filter to TARGET_CLASSES themselves; ultralytics returns every box.
+    """
+    with inference_lock():
+        if hasattr(model, "detect"):
+            return model.detect(frames, classes=TARGET_CLASSES)
+
+        if INFERENCE_IMAGE_SIZE:
+            results = model(frames, verbose=False, imgsz=INFERENCE_IMAGE_SIZE)
+        else:
+            results = model(frames, verbose=False)
+
+    return [
+        [(int(box.cls[0]), float(box.conf[0])) for box in result.boxes]
+        for result in results
+    ]
+
+def _new_state() -> dict:
+    return {"max_conf": 0.0, "id_card_detected": False, "frames_inferred": 0}
+
+def _run_batch(model, frames: list, frame_numbers: list, states: list):
+    """
+    Runs one detector call over a list of frames and folds each frame's detections
+    into its own state (frames of one batch may come from different videos).
     """
-    model = YOLO(YOLO_MODEL_PATH)
-    
-    # Classes: 67 (cell phone), 73 (book), 27 (tie - proxy for lanyard)
-    TARGET_CLASSES = [67, 73, 27] 
+    detections = predict(model, frames)
+
+    # Checked once per batch so the per-box logging costs nothing when DEBUG is off
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    for frame_number, frame_detections, state in zip(frame_numbers, detections, states):
+        state["frames_inferred"] += 1
+        for cls_id, conf in frame_detections:
+            if cls_id in TARGET_CLASSES:
+                if conf > state["max_conf"]:
+                    state["max_conf"] = conf
+
+                if conf >= ID_CARD_CONFIDENCE_THRESHOLD:
+                    state["id_card_detected"] = True
+                    if debug:
+                        logger.debug(f"ID Card Candidate Detected! Class: {cls_id}, Conf: {conf}")
+
+            if debug and conf > 0.3:
+                logger.debug(f"Frame {frame_number} - Detected: {cls_id} ({conf:.2f})")
+
+def _summary(state: dict, sampler: FrameSampler, gate) -> dict:
+    return {
+        "id_card_present": state["id_card_detected"],
+        "id_card_confidence": state["max_conf"],
+        "frames_decoded": sampler.frames_decoded,
+        "frames_skipped": gate.frames_skipped if gate is not None else 0,
+        "frames_inferred": state["frames_inferred"]
+    }
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Could not open video: {video_path}")
+def _resolve_options(model, batch_size, scene_gate):
+    if model is None:
+        model = get_model()
+    if batch_size is None:
+        batch_size = DETECTION_BATCH_SIZE
+    if scene_gate is None:
+        scene_gate = SCENE_CHANGE_GATE
+    return model, max(1, int(batch_size)), scene_gate
+
+def _decode_into(ring: FrameRing, sampler: FrameSampler, gate):
+    """
+    Decoder thread: samples, gates and downscales frames into the ring until the clip ends.
+    """
+    error = None
+    try:
+        for frame_number, frame in sampler:
+            if gate is not None and not gate.should_infer(frame):
+                continue
+            if not ring.put(frame_number, downscale_for_inference(frame)):
+                break
+    except BaseException as e:
+        error = e
+    finally:
+        ring.close(error)
 
-    max_conf = 0.0
-    id_card_detected = False
-    
-    frame_count = 0
-    
+def _detect_pipelined(model, sampler: FrameSampler, gate, state: dict, batch_size: int, ring_size: int) -> dict:
+    """
+    Decoding runs on its own thread and fills a FrameRing while this thread runs inference,
+    so decode latency overlaps with detection. Returns the ring's tuning stats.
+    """
+    # Room for the batch being inferred plus the next one being decoded
+    ring = FrameRing(max(ring_size, 2 * batch_size))
+    decoder = threading.Thread(target=_decode_into, args=(ring, sampler, gate), name="frame-decoder", daemon=True)
+    decoder.start()
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            indices, frame_numbers, frames = ring.take(batch_size)
+            if not indices:
                 break
-            
-            frame_count += 1
-            if frame_count % FRAME_SAMPLE_RATE != 0:
+            try:
+                _run_batch(model, frames, frame_numbers, [state] * len(frames))
+            finally:
+                ring.release(indices)
+    finally:
+        ring.stop()
+        decoder.join()
+    return ring.stats()
+
+def detect_id_card(media, model=None, batch_size: int = None, sampling_mode: str = None,
+                   scene_gate: bool = None, pipelined: bool = None) -> dict:
+    """
+    Detects ID card presence in a video using YOLO.
+    Accepts a MediaContext (already probed) or a file path.
+    Uses the process-wide warm model from the registry unless one is passed in.
+    Frames are picked by FrameSampler (`sampling_mode`, defaults to FRAME_SAMPLING_MODE)
+    and sent to the detector in batches of `batch_size`
+    (defaults to DETECTION_BATCH_SIZE; 1 runs frame by frame).
+    With the scene-change gate on (`scene_gate`, defaults to SCENE_CHANGE_GATE), sampled
+    frames that barely differ from the last inferred one are skipped; the rest are
+    downscaled to INFERENCE_IMAGE_SIZE before detection.
+    With `pipelined` (defaults to DETECTION_PIPELINING) a decoder thread feeds a bounded
+    FrameRing of FRAME_RING_SIZE frames while inference drains it; the result then also
+    carries the ring's queue-depth and stall stats under "pipeline".
+    Besides the verdict, returns how many frames were decoded, skipped and run through the model.
+    """
+    model, batch_size, scene_gate = _resolve_options(model, batch_size, scene_gate)
+    if pipelined is None:
+        pipelined = DETECTION_PIPELINING
+    gate = SceneChangeGate() if scene_gate else None
+
+    media = as_media_context(media)
+    cap = media.open_capture()
+
+    state = _new_state()
+    batch_frames = []
+    batch_numbers = []
+
+    sampler = FrameSampler(cap, mode=sampling_mode, fps=media.fps)
+
+    if pipelined:
+        try:
+            ring_stats = _detect_pipelined(model, sampler, gate, state, batch_size, FRAME_RING_SIZE)
+        finally:
+            cap.release()
+        summary = _summary(state, sampler, gate)
+        summary["pipeline"] = ring_stats
+        return summary
+
+    try:
+        for frame_number, frame in sampler:
+            if gate is not None and not gate.should_infer(frame):
                 continue
 
-            results = model(frame, verbose=False)
-            
-            for result in results:
-                for box in result.boxes:
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    
-                    if cls_id in TARGET_CLASSES:
-                        if conf > max_conf:
-                            max_conf = conf
-                        
-                        if conf >= ID_CARD_CONFIDENCE_THRESHOLD:
-                            id_card_detected = True
-                            print(f"DEBUG: ID Card Candidate Detected! Class: {cls_id}, Conf: {conf}")
-
-                if box.conf[0] > 0.3:
-                    print(f"DEBUG: Frame {frame_count} - Detected: {int(box.cls[0])} ({float(box.conf[0]):.2f})")
-
-                            
+            batch_frames.append(downscale_for_inference(frame))
+            batch_numbers.append(frame_number)
+
+            if len(batch_frames) >= batch_size:
+                _run_batch(model, batch_frames, batch_numbers, [state] * len(batch_frames))
+                batch_frames = []
+                batch_numbers = []
+
+        # Flush the last partial batch
+        if batch_frames:
+            _run_batch(model, batch_frames, batch_numbers, [state] * len(batch_frames))
+
     finally:
         cap.release()
 
-    return {
-        "id_card_present": id_card_detected,
-        "id_card_confidence": max_conf
-    }
+    return _summary(state, sampler, gate)
+
+def detect_id_cards(medias: list, model=None, batch_size: int = None, sampling_mode: str = None,
+                    scene_gate: bool = None) -> list:
+    """
+    detect_id_card over several videos at once. Sampled frames are taken round-robin
+    from every video and packed into shared detector batches, so short clips still
+    fill whole batches.
+    Returns one result per input, in order; a video that cannot be opened gets
+    {"error": "..."} instead of failing the others.
+    """
+    model, batch_size, scene_gate = _resolve_options(model, batch_size, scene_gate)
+
+    readers = []
+    results = [None] * len(medias)
+    for index, media in enumerate(medias):
+        try:
+            media = as_media_context(media)
+            cap = media.open_capture()
+        except Exception as e:
+            results[index] = {"error": str(e)}
+            continue
+        sampler = FrameSampler(cap, mode=sampling_mode, fps=media.fps)
+        readers.append({
+            "index": index,
+            "cap": cap,
+            "sampler": sampler,
+            "frames": iter(sampler),
+            "gate": SceneChangeGate() if scene_gate else None,
+            "state": _new_state(),
+        })
+
+    batch_frames = []
+    batch_numbers = []
+    batch_states = []
+
+    try:
+        active = list(readers)
+        while active:
+            for reader in list(active):
+                try:
+                    frame_number, frame = next(reader["frames"])
+                except StopIteration:
+                    active.remove(reader)
+                    continue
+
+                if reader["gate"] is not None and not reader["gate"].should_infer(frame):
+                    continue
+
+                batch_frames.append(downscale_for_inference(frame))
+                batch_numbers.append(frame_number)
+                batch_states.append(reader["state"])
+
+                if len(batch_frames) >= batch_size:
+                    _run_batch(model, batch_frames, batch_numbers, batch_states)
+                    batch_frames = []
+                    batch_numbers = []
+                    batch_states = []
+
+        if batch_frames:
+            _run_batch(model, batch_frames, batch_numbers, batch_states)
+
+    finally:
+        for reader in readers:
+            reader["cap"].release()
+
+    for reader in readers:
+        results[reader["index"]] = _summary(reader["state"], reader["sampler"], reader["gate"])
+    return results
@@ -0,0 +1,104 @@
+import os
+import sys
+from pathlib import Path
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MAX_VIDEO_DURATION, ALLOWED_EXTENSIONS
+
+class MediaContext:
+    """
+    Container metadata for one uploaded video, probed once per request and shared
+    by every pipeline stage (validation, ID card detection, audio extraction).
+
+    Probing only reads the container header through ffmpeg; no frames or audio
+    samples are decoded.
+    """
+
+    def __init__(self, path: str, duration: float, fps: float, width: int, height: int,
+                 frame_total: int, has_audio: bool, audio_fps: int = None):
+        self.path = path
+        self.duration = duration
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.frame_total = frame_total
+        self.has_audio = has_audio
+        self.audio_fps = audio_fps
+
+    @classmethod
+    def probe(cls, path: str) -> "MediaContext":
+        """
+        Reads container metadata and fails fast on inputs that cannot be valid.
+        Raises FileNotFoundError, ValueError (bad input) or RuntimeError (unreadable container).
+        """
+        path = str(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Video file not found: {path}")
+
+        ext = Path(path).suffix.lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"Invalid file format: {ext}. Allowed: {ALLOWED_EXTENSIONS}")
+
+        if os.path.getsize(path) == 0:
+            raise ValueError("Video file is empty.")
+
+        try:
+            from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+            infos = ffmpeg_parse_infos(path)
+        except Exception as e:
+            # moviepy appends the whole ffmpeg banner; the first line is the useful part
+            message = str(e).strip().splitlines()[0] if str(e).strip() else repr(e)
+            raise RuntimeError(f"Failed to process video file: {message}")
+
+        if not infos.get("video_found"):
+            raise ValueError("File contains no video stream.")
+
+        width, height = infos.get("video_size") or (0, 0)
+        return cls(
+            path=path,
+            duration=infos.get("duration") or 0.0,
+            fps=infos.get("video_fps") or 0.0,
+            width=width,
+            height=height,
+            frame_total=infos.get("video_nframes") or 0,
+            has_audio=bool(infos.get("audio_found")),
+            audio_fps=infos.get("audio_fps"),
+        )
+
+    def check_limits(self):
+        """
+        Raises ValueError if the clip breaks the service constraints.
+        """
+        if self.duration <= 0:
+            raise ValueError("Could not determine video duration.")
+        if self.duration > MAX_VIDEO_DURATION:
+            raise ValueError(f"Video duration ({self.duration:.2f}s) exceeds limit ({MAX_VIDEO_DURATION}s).")
+
+    def open_capture(self) -> cv2.VideoCapture:
+        """
+        Opens a frame decoder for the video stream.
+        """
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Could not open video: {self.path}")
+        return cap
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": self.duration,
+            "fps": self.fps,
+            "width": self.width,
+            "height": self.height,
+            "frame_total": self.frame_total,
+            "has_audio": self.has_audio,
+        }
+
+def as_media_context(media) -> MediaContext:
+    """
+    Accepts either a MediaContext or a file path (probing it), so stages stay callable on a bare path.
+    """
+    if isinstance(media, MediaContext):
+        return media
+    return MediaContext.probe(media)
@@ -0,0 +1,92 @@
+import threading
+import logging
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import YOLO_MODEL_PATH, YOLO_WARMUP_IMGSZ, DETECTOR_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Process-wide detector state. Each worker process loads the model once and
+# every request in that process shares it.
+_model = None
+_load_lock = threading.Lock()
+_inference_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def create_detector(backend: str = None):
+    """
+    Builds a fresh, unwarmed detector for the given backend (DETECTOR_BACKEND by default).
+    """
+    backend = backend or DETECTOR_BACKEND
+    if backend == "onnx":
+        from video.onnx_detector import OnnxDetector
+        return OnnxDetector()
+    if backend == "ultralytics":
+        from ultralytics import YOLO
+        logger.info(f"Loading YOLO model: {YOLO_MODEL_PATH}")
+        return YOLO(YOLO_MODEL_PATH)
+    raise ValueError(f"Unknown detector backend: {backend}. Allowed: ['ultralytics', 'onnx']")
+
+def warmup(model):
+    """
+    Runs one inference on a blank frame.
+    """
+    dummy = np.zeros((YOLO_WARMUP_IMGSZ, YOLO_WARMUP_IMGSZ, 3), dtype=np.uint8)
+    if hasattr(model, "detect"):
+        model.detect([dummy], classes=[])
+    else:
+        model(dummy, verbose=False)
+
+def load_model():
+    """
+    Loads the detector (DETECTOR_BACKEND) and runs a warmup inference.
+    Safe to call from several threads; only the first call does the work.
+    """
+    global _model
+
+    if _ready.is_set():
+        return _model
+
+    with _load_lock:
+        if _ready.is_set():
+            return _model
+
+        model = create_detector()
+
+        # First inference builds the graph / fuses layers; pay it here instead of on a request
+        warmup(model)
+
+        _model = model
+        _ready.set()
+        logger.info(f"Detector ({DETECTOR_BACKEND}) warmed up and ready.")
+
+    return _model
+
+
+def get_model():
+    """
+    Returns the shared, warmed-up detector (loading it on first use).
+    """
+    if not _ready.is_set():
+        return load_model()
+    return _model
+
+
+def is_ready() -> bool:
+    """
+    True once the detector has been loaded and warmed up in this process.
+    """
+    return _ready.is_set()
+
+
+def inference_lock() -> threading.Lock:
+    """
+    Lock that serializes calls into the shared model.
+    Ultralytics predictors keep per-call state, so concurrent threads must not run it at once.
+    """
+    return _inference_lock
@@ -0,0 +1,133 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import YOLO_MODEL_PATH, ONNX_MODEL_PATH, ONNX_INTRA_OP_THREADS, INFERENCE_IMAGE_SIZE
+from pipeline.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# ultralytics' default predict confidence; boxes below it never reach the Python side there either
+MIN_CONFIDENCE = 0.25
+_LETTERBOX_FILL = 114
+
+def export_onnx(pt_path: str = YOLO_MODEL_PATH, output_path: str = ONNX_MODEL_PATH, imgsz: int = None) -> str:
+    """
+    Exports the PyTorch YOLO weights to ONNX (dynamic batch) at `output_path` and returns it.
+    Job workers start together, so the export runs under a file lock in a scratch
+    directory and is moved into place atomically; a worker that waited on the lock
+    finds the finished file and skips the export.
+    """
+    with file_lock(f"{output_path}.lock"):
+        if os.path.exists(output_path):
+            return output_path
+
+        from ultralytics import YOLO
+        logger.info(f"Exporting {pt_path} to {output_path}...")
+        # ultralytics writes the export next to the weights, so export from a private copy
+        scratch = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            source = pt_path
+            if os.path.exists(pt_path):
+                source = shutil.copy(pt_path, scratch)
+            exported = YOLO(source).export(format="onnx", dynamic=True, imgsz=imgsz or INFERENCE_IMAGE_SIZE or 640)
+            os.replace(exported, output_path)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return output_path
+
+def _letterbox(frame: np.ndarray, size: int) -> np.ndarray:
+    """
+    Resizes keeping aspect ratio and pads to size x size, as ultralytics does before inference.
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR) if (new_w, new_h) != (width, height) else frame
+
+    canvas = np.full((size, size, 3), _LETTERBOX_FILL, dtype=np.uint8)
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return canvas
+
+class OnnxDetector:
+    """
+    YOLOv8 detector exported to ONNX and run with ONNX Runtime on CPU.
+
+    Only presence and best confidence of the target classes matter to the caller, so
+    postprocessing skips box decoding and NMS: each anchor takes its argmax class (as
+    ultralytics does), anchors outside the target classes or under MIN_CONFIDENCE are
+    dropped, and the best score per class is kept. NMS never removes the top-scoring
+    box of a class, so the result matches the ultralytics path.
+    """
+
+    def __init__(self, model_path: str = ONNX_MODEL_PATH, intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("onnxruntime not installed. Install with: pip install onnxruntime")
+
+        if not os.path.exists(model_path):
+            model_path = export_onnx(output_path=model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Static exports fix batch and image size; dynamic ones report symbolic dims
+        batch_dim, _, height_dim, _ = model_input.shape
+        self.fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+        self.imgsz = height_dim if isinstance(height_dim, int) else (INFERENCE_IMAGE_SIZE or 640)
+        logger.info(f"ONNX detector loaded: {model_path} (imgsz={self.imgsz}, threads={intra_op_threads})")
+
+    def _preprocess(self, frames: list) -> np.ndarray:
+        batch = np.stack([_letterbox(frame, self.imgsz) for frame in frames])
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        return np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+    def _run(self, frames: list) -> np.ndarray:
+        if self.fixed_batch == 1 and len(frames) > 1:
+            return np.concatenate([self._run([frame]) for frame in frames])
+        return self.session.run(None, {self.input_name: self._preprocess(frames)})[0]
+
+    def detect(self, frames: list, classes) -> list:
+        """
+        Returns, per frame, a list of (class_id, confidence) with the best score of each
+        target class present at or above MIN_CONFIDENCE.
+        """
+        output = self._run(frames)  # (batch, 4 + num_classes, anchors)
+        scores = output[:, 4:, :]
+        best_cls = scores.argmax(axis=1)  # (batch, anchors)
+        best_conf = scores.max(axis=1)
+
+        classes = np.asarray(list(classes))
+        keep = np.isin(best_cls, classes) & (best_conf >= MIN_CONFIDENCE)
+
+        detections = []
+        for i in range(len(frames)):
+            frame_cls = best_cls[i][keep[i]]
+            frame_conf = best_conf[i][keep[i]]
+            frame_detections = []
+            for cls_id in classes:
+                matches = frame_conf[frame_cls == cls_id]
+                if matches.size:
+                    frame_detections.append((int(cls_id), float(matches.max())))
+            detections.append(frame_detections)
+        return detections
+
+if __name__ == "__main__":
+    # Deploy step: python video/onnx_detector.py (exports ONNX_MODEL_PATH if missing)
+    print(export_onnx())
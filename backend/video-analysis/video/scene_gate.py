@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SCENE_CHANGE_THRESHOLD, SCENE_THUMBNAIL_WIDTH, INFERENCE_IMAGE_SIZE
+
+class SceneChangeGate:
+    """
+    Skips sampled frames that are nearly identical to the last frame sent to the detector.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with the thumbnail of
+    the last inferred frame by mean absolute difference (0-1). Comparing against the last
+    *inferred* frame, not the previous sample, means slow drift still triggers inference.
+    """
+
+    def __init__(self, threshold: float = SCENE_CHANGE_THRESHOLD, thumbnail_width: int = SCENE_THUMBNAIL_WIDTH):
+        self.threshold = threshold
+        self.thumbnail_width = thumbnail_width
+        self._reference = None
+        self.frames_passed = 0
+        self.frames_skipped = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        thumb_height = max(1, round(height * self.thumbnail_width / width))
+        small = cv2.resize(frame, (self.thumbnail_width, thumb_height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        thumbnail = self._thumbnail(frame)
+        if self._reference is not None and self._reference.shape == thumbnail.shape:
+            diff = cv2.absdiff(thumbnail, self._reference).mean() / 255.0
+            if diff < self.threshold:
+                self.frames_skipped += 1
+                return False
+
+        self._reference = thumbnail
+        self.frames_passed += 1
+        return True
+
+def downscale_for_inference(frame: np.ndarray, max_side: int = INFERENCE_IMAGE_SIZE) -> np.ndarray:
+    """
+    Shrinks a frame so its longest side is at most `max_side` (0 disables). Never upscales.
+    """
+    height, width = frame.shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return frame
+    scale = max_side / longest
+    return cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
@@ -155,13 +155,12 @@ const VideoInterview = () => {
         setUploading(true);
         setError('');
 
-        const formData = new FormData();
-        formData.append('file', videoBlob, 'interview.webm');
-
         try {
-            const response = await fetch('http://localhost:8002/analyze-video', {
+            // Raw-body upload: streamed to disk server-side and rejected early if invalid
+            const response = await fetch('http://localhost:8002/analyze-video/stream?filename=interview.webm', {
                 method: 'POST',
-                body: formData,
+                headers: { 'Content-Type': videoBlob.type || 'video/webm' },
+                body: videoBlob,
             });
 
             if (!response.ok) {